@@ -0,0 +1,210 @@
+"""
+Benchmark: dataset bytes the scrapers download, full items vs. projected reads.
+
+A local stub of the Apify API serves each actor's dataset with items shaped
+like the real actors' output (YouTube video records, TikTok posts with
+author/music/video metadata, a Google Trends record with articles). "before"
+reads the whole dataset with iterate_items() as the scrapers used to; "after"
+runs the scrapers themselves, which request only the fields they use and stop
+at the item count they need.
+
+Usage:
+    python -m manager.benchmarks.bench_apify_dataset [extra_items]
+
+extra_items pads every dataset with that many additional records, as when an
+actor returns more than was asked for (default 0 and 50).
+"""
+
+import asyncio
+import json
+import random
+import string
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from manager.tools import apify_async
+from manager.tools import google_scrapper, scrape_tiktok, yt_scrapper
+
+rng = random.Random(7)
+
+
+def text(words: int) -> str:
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(words))
+
+
+def youtube_item(i: int) -> dict:
+    return {
+        "title": text(8), "type": "shorts", "id": f"yt{i:05d}", "url": f"https://www.youtube.com/shorts/yt{i:05d}",
+        "thumbnailUrl": f"https://i.ytimg.com/vi/yt{i:05d}/hqdefault.jpg", "viewCount": rng.randint(1e3, 1e7),
+        "date": "2025-08-10T12:00:00.000Z", "likes": rng.randint(10, 1e5), "location": None,
+        "channelName": text(2), "channelUrl": f"https://www.youtube.com/@{text(1)}", "channelId": text(1),
+        "channelDescription": text(60), "numberOfSubscribers": rng.randint(1e3, 1e6), "duration": "00:00:42",
+        "commentsCount": rng.randint(0, 5000), "text": text(120), "descriptionLinks": [
+            {"url": f"https://example.com/{text(1)}", "text": text(3)} for _ in range(4)
+        ], "hashtags": [f"#{text(1)}" for _ in range(8)], "subtitles": None, "isMonetized": True,
+        "commentsTurnedOff": False, "fromYTUrl": "https://www.youtube.com/results", "input": text(2),
+    }
+
+
+def tiktok_item(i: int) -> dict:
+    return {
+        "id": f"7{i:018d}", "text": text(25), "textLanguage": "en", "createTime": 1754820000 + i,
+        "createTimeISO": "2025-08-10T10:00:00.000Z", "isAd": False,
+        "authorMeta": {
+            "id": str(rng.randint(1e15, 1e16)), "name": text(1), "nickName": text(2), "verified": False,
+            "signature": text(20), "bioLink": None, "avatar": f"https://p16-sign.tiktokcdn.com/{text(1)}.jpeg",
+            "originalAvatarUrl": f"https://p16-sign.tiktokcdn.com/{text(1)}~c5_720x720.jpeg",
+            "privateAccount": False, "following": rng.randint(0, 500), "fans": rng.randint(0, 1e6),
+            "heart": rng.randint(0, 1e7), "video": rng.randint(0, 900), "digg": rng.randint(0, 1e4),
+        },
+        "musicMeta": {
+            "musicName": text(3), "musicAuthor": text(2), "musicOriginal": True, "playUrl": f"https://sf16.tiktokcdn.com/{text(1)}.mp3",
+            "coverMediumUrl": f"https://p16-sign.tiktokcdn.com/{text(1)}.jpeg", "musicId": str(rng.randint(1e15, 1e16)),
+        },
+        "webVideoUrl": f"https://www.tiktok.com/@{text(1)}/video/7{i:018d}",
+        "mediaUrls": [f"https://api.apify.com/v2/key-value-stores/{text(1)}/records/video-{i}"],
+        "videoMeta": {
+            "height": 1024, "width": 576, "duration": 31, "coverUrl": f"https://p16-sign.tiktokcdn.com/{text(1)}.jpeg",
+            "originalCoverUrl": f"https://p16-sign.tiktokcdn.com/{text(1)}.jpeg", "definition": "540p", "format": "mp4",
+            "subtitleLinks": [{"language": "eng-US", "downloadLink": f"https://v16.tiktokcdn.com/{text(1)}"}],
+            "downloadAddr": f"https://api.apify.com/v2/key-value-stores/{text(1)}/records/video-{i}",
+        },
+        "diggCount": rng.randint(0, 1e6), "shareCount": rng.randint(0, 1e5), "playCount": rng.randint(1e3, 1e8),
+        "collectCount": rng.randint(0, 1e5), "commentCount": rng.randint(0, 1e4), "mentions": [],
+        "detailedMentions": [], "hashtags": [
+            {"id": str(rng.randint(1e6, 1e7)), "name": text(1), "title": text(6), "cover": ""} for _ in range(6)
+        ], "effectStickers": [], "isSlideshow": False, "isPinned": False, "isSponsored": False,
+        "searchQuery": "gaming",
+    }
+
+
+def google_items(extra: int) -> list[dict]:
+    trends = [
+        {
+            "term": text(3), "trend_volume": rng.randint(1e3, 1e6), "trend_volume_formatted": "200K+",
+            "started_timestamp": [1754820000, 0], "increase_percentage": rng.randint(100, 1000),
+            "categories": [{"id": 17, "name": text(1)}], "trend_breakdown": [text(3) for _ in range(6)],
+            "news": [
+                {"title": text(12), "url": f"https://news.example.com/{text(2)}", "source": text(2),
+                 "picture": f"https://news.example.com/{text(1)}.jpg", "snippet": text(40)}
+                for _ in range(5)
+            ],
+        }
+        for _ in range(25)
+    ]
+    items = [{"trending_searches": trends, "country": "US", "timeframe": "24"}]
+    # Regional/related records the actor emits after the trending list
+    items += [{"geo": text(1), "related_queries": [text(3) for _ in range(20)], "summary": text(80)}
+              for _ in range(10 + extra)]
+    return items
+
+
+def make_handler(datasets: dict[str, list], transferred: dict[str, int]):
+    class ApifyStubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def send_json(self, payload, headers=None) -> int:
+            body = json.dumps(payload).encode()
+            self.send_response(200 if self.command == 'GET' else 201)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            return len(body)
+
+        def run_record(self, actor_id: str) -> dict:
+            return {"data": {"id": f"run-{actor_id}", "actId": actor_id, "status": "SUCCEEDED",
+                             "defaultDatasetId": actor_id}}
+
+        def do_POST(self):
+            # POST /v2/acts/<actor_id>/runs
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_json(self.run_record(urlparse(self.path).path.split('/')[3]))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = url.path.split('/')
+            if parts[2] == 'actor-runs':
+                self.send_json(self.run_record(parts[3].removeprefix('run-')))
+                return
+            if parts[2] == 'acts':
+                # No earlier runs to reuse
+                self.send_json({"data": {"items": [], "total": 0, "offset": 0, "count": 0, "limit": 10, "desc": True}})
+                return
+
+            # GET /v2/datasets/<id>/items
+            query = parse_qs(url.query)
+            items = datasets[parts[3]]
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', [str(len(items))])[0])
+            page = items[offset:offset + limit]
+            if 'fields' in query:
+                fields = query['fields'][0].split(',')
+                page = [{f: item[f] for f in fields if f in item} for item in page]
+            transferred[parts[3]] = transferred.get(parts[3], 0) + self.send_json(page, {
+                'x-apify-pagination-total': str(len(items)), 'x-apify-pagination-offset': str(offset),
+                'x-apify-pagination-limit': str(limit), 'x-apify-pagination-desc': '',
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return ApifyStubHandler
+
+
+async def read_full(actor_id: str) -> int:
+    """What the scrapers did before: every field of every item"""
+    client = apify_async.get_async_client()
+    return len([item async for item in client.dataset(actor_id).iterate_items()])
+
+
+async def run_scrapers():
+    await yt_scrapper.yt_scrapper_async("gaming", "NEWEST", 2)
+    await scrape_tiktok.scrape_tiktok_async("gaming", "US", 3)
+    await google_scrapper.google_scrapper_async("US", "24")
+
+
+def measure(extra: int):
+    datasets = {
+        yt_scrapper.ACTOR_ID: [youtube_item(i) for i in range(2 + extra)],
+        scrape_tiktok.ACTOR_ID: [tiktok_item(i) for i in range(3 + extra)],
+        google_scrapper.ACTOR_ID: google_items(extra),
+    }
+    before, after = {}, {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(datasets, before))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    apify_async.APIFY_API_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    # Measure the dataset reads, not cache hits
+    apify_async.APIFY_CACHE_ENABLED = False
+    # The stub's media references are not real stored videos
+    scrape_tiktok.ACTOR_MEDIA_ENABLED = False
+    try:
+        for actor_id in datasets:
+            asyncio.run(read_full(actor_id))
+        server.RequestHandlerClass = make_handler(datasets, after)
+        asyncio.run(run_scrapers())
+    finally:
+        server.shutdown()
+
+    labels = {yt_scrapper.ACTOR_ID: 'youtube', scrape_tiktok.ACTOR_ID: 'tiktok', google_scrapper.ACTOR_ID: 'google'}
+    for actor_id, label in labels.items():
+        ratio = before[actor_id] / after[actor_id]
+        print(f"{extra:>6} {label:<8} {len(datasets[actor_id]):>6} "
+              f"{before[actor_id] / 1024:>9.1f}KB {after[actor_id] / 1024:>9.1f}KB {ratio:>7.1f}x")
+
+
+def main():
+    extras = [int(arg) for arg in sys.argv[1:]] or [0, 50]
+
+    print(f"{'extra':>6} {'actor':<8} {'items':>6} {'before':>11} {'after':>11} {'saved':>8}")
+    print("-" * 56)
+    for extra in extras:
+        measure(extra)
+
+
+if __name__ == "__main__":
+    main()
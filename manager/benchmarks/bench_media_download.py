@@ -0,0 +1,118 @@
+"""
+Benchmark: download_file (what summ_down uses) vs. the old BytesIO + temp file path.
+
+A local HTTP server streams synthetic video bodies of 50-500 MB, honouring
+Range requests, so the numbers measure our copying, not the CDN. Peak memory
+is the Python allocation peak reported by tracemalloc.
+
+Usage:
+    python -m manager.benchmarks.bench_media_download [size_mb ...]
+"""
+
+import io
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from manager.tools.media_download import download_file
+
+DEFAULT_SIZES_MB = [50, 200, 500]
+BLOCK = os.urandom(1024 * 1024)
+RANGE_PATTERN = re.compile(r'bytes=(\d+)-(\d+)?')
+
+
+class SyntheticVideoHandler(BaseHTTPRequestHandler):
+    """Serves /<size_mb> as a body of that many MB without buffering it"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        size = int(self.path.strip('/')) * len(BLOCK)
+        first, last = 0, size - 1
+        match = RANGE_PATTERN.match(self.headers.get('Range', ''))
+        if match:
+            first = int(match.group(1))
+            last = min(int(match.group(2) or size - 1), size - 1)
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {first}-{last}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(last - first + 1))
+        self.end_headers()
+
+        offset = first
+        while offset <= last:
+            start = offset % len(BLOCK)
+            n = min(len(BLOCK) - start, last - offset + 1)
+            self.wfile.write(BLOCK[start:start + n])
+            offset += n
+
+    def log_message(self, format, *args):
+        pass
+
+
+def legacy_download(url: str) -> int:
+    """The old path: 8 KB chunks into BytesIO, getvalue(), then a temp file for upload"""
+    response = requests.get(url, stream=True)
+    response.raise_for_status()
+
+    video_data = io.BytesIO()
+    for chunk in response.iter_content(chunk_size=8192):
+        video_data.write(chunk)
+    video_bytes = video_data.getvalue()
+
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
+        tmp_file.write(video_bytes)
+        tmp_path = tmp_file.name
+    os.unlink(tmp_path)
+    return len(video_bytes)
+
+
+def streaming_download(url: str) -> int:
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+    try:
+        return download_file(url, tmp_path)['bytes']
+    finally:
+        os.unlink(tmp_path)
+
+
+def measure(fn, url: str) -> tuple[float, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn(url)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES_MB
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SyntheticVideoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'size':>8} {'path':<10} {'peak mem':>10} {'throughput':>12}")
+    print("-" * 44)
+    try:
+        for size_mb in sizes:
+            url = f"{base_url}/{size_mb}"
+            for label, fn in [('legacy', legacy_download), ('streaming', streaming_download)]:
+                elapsed, peak, size = measure(fn, url)
+                assert size == size_mb * len(BLOCK)
+                print(f"{size_mb:>6}MB {label:<10} {peak / 1024 / 1024:>8.1f}MB {size / 1024 / 1024 / elapsed:>8.1f}MB/s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: download_file over one connection vs. parallel byte-range requests.
+
+A local HTTP server caps every connection at a fixed rate, like CDNs that
+throttle per connection, and honours Range requests. A second server ignores
+Range to exercise the single-stream fallback.
+
+Usage:
+    python -m manager.benchmarks.bench_range_download [size_mb] [per_connection_mb_s]
+"""
+
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from manager.tools.media_download import download_file, host_throughput
+
+BLOCK = os.urandom(256 * 1024)
+RANGE_PATTERN = re.compile(r'bytes=(\d+)-(\d+)?')
+
+
+def make_handler(size: int, bytes_per_second: float, ranges: bool):
+    class ThrottledHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            first, last = 0, size - 1
+            match = RANGE_PATTERN.match(self.headers.get('Range', '')) if ranges else None
+            if match:
+                first = int(match.group(1))
+                last = min(int(match.group(2) or size - 1), size - 1)
+                self.send_response(206)
+                self.send_header('Content-Range', f"bytes {first}-{last}/{size}")
+            else:
+                self.send_response(200)
+            self.send_header('Content-Type', 'video/mp4')
+            self.send_header('Content-Length', str(last - first + 1))
+            self.end_headers()
+
+            remaining = last - first + 1
+            while remaining > 0:
+                n = min(len(BLOCK), remaining)
+                self.wfile.write(BLOCK[:n])
+                remaining -= n
+                time.sleep(n / bytes_per_second)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThrottledHandler
+
+
+def serve(handler) -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+
+
+def run(label: str, fn, url: str, expected: int):
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+    try:
+        stats = fn(url, tmp_path)
+        assert stats['bytes'] == expected == os.path.getsize(tmp_path)
+        print(f"{label:<28} {stats['seconds']:>7.2f}s {stats['mb_per_s']:>8.1f}MB/s {stats['parts']:>6}")
+    finally:
+        os.unlink(tmp_path)
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    rate_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 16
+    size = size_mb * 1024 * 1024
+
+    ranged, ranged_url = serve(make_handler(size, rate_mb * 1024 * 1024, ranges=True))
+    plain, plain_url = serve(make_handler(size, rate_mb * 1024 * 1024, ranges=False))
+
+    print(f"{size_mb} MB file, {rate_mb:g} MB/s per connection")
+    print(f"{'path':<28} {'time':>8} {'throughput':>12} {'parts':>6}")
+    print("-" * 58)
+    try:
+        for workers in (1, 2, 4, 8):
+            run(f'ranges x{workers}', lambda u, p: download_file(u, p, workers=workers), ranged_url, size)
+        run('ranges x4, no server support', lambda u, p: download_file(u, p, workers=4), plain_url, size)
+    finally:
+        ranged.shutdown()
+        plain.shutdown()
+
+    print()
+    for host, stats in host_throughput().items():
+        print(f"{host}: {stats['downloads']} downloads at {stats['mb_per_s']:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
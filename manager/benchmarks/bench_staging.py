@@ -0,0 +1,82 @@
+"""
+Benchmark: staging a video on disk vs. in memory (/dev/shm tmpfs, memfd).
+
+Each run writes a synthetic video in 1 MB chunks (as the downloader does) and
+reads it back in 8 MB chunks (as the Gemini upload does). The "disk (fsync)"
+row forces the data to the device, which is what a loaded node ends up paying
+once the page cache is under pressure.
+
+Usage:
+    python -m manager.benchmarks.bench_staging [size_mb ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from manager.tools.media_staging import MEDIA_SHM_DIR, shm_available
+
+DEFAULT_SIZES_MB = [50, 200]
+BLOCK = os.urandom(1024 * 1024)
+READ_SIZE = 8 * 1024 * 1024
+
+
+def write_and_read(path: str, size_mb: int, fsync: bool = False) -> tuple[float, float]:
+    start = time.perf_counter()
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(BLOCK)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        while f.read(READ_SIZE):
+            pass
+    return write_time, time.perf_counter() - start
+
+
+def staged_file(directory: str, size_mb: int, fsync: bool = False) -> tuple[float, float]:
+    fd, path = tempfile.mkstemp(suffix='.mp4', dir=directory)
+    os.close(fd)
+    try:
+        return write_and_read(path, size_mb, fsync)
+    finally:
+        os.unlink(path)
+
+
+def memfd_file(size_mb: int) -> tuple[float, float]:
+    fd = os.memfd_create('video.mp4')
+    try:
+        return write_and_read(f"/proc/self/fd/{fd}", size_mb)
+    finally:
+        os.close(fd)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES_MB
+
+    backends = [
+        ('disk', lambda mb: staged_file(tempfile.gettempdir(), mb)),
+        ('disk (fsync)', lambda mb: staged_file(tempfile.gettempdir(), mb, fsync=True)),
+    ]
+    if shm_available(min_free=max(sizes) * 2 * len(BLOCK)):
+        backends.append(('/dev/shm', lambda mb: staged_file(str(MEDIA_SHM_DIR), mb)))
+    else:
+        print(f"{MEDIA_SHM_DIR} not available or too small, skipping")
+    if hasattr(os, 'memfd_create'):
+        backends.append(('memfd', memfd_file))
+
+    print(f"{'size':>8} {'backend':<14} {'write':>10} {'read':>10}")
+    print("-" * 46)
+    for size_mb in sizes:
+        for label, fn in backends:
+            write_time, read_time = fn(size_mb)
+            print(f"{size_mb:>6}MB {label:<14} {size_mb / write_time:>6.0f}MB/s {size_mb / read_time:>6.0f}MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: staged summ_down pipeline vs. the old serial loop.
+
+Stage latencies are simulated (no network, no Gemini quota used) with the
+rough proportions seen on a real 5-video trend run:
+download ~3-6s, upload ~1s, PROCESSING poll ~4-10s, generate_content ~5s.
+
+Usage:
+    python -m manager.benchmarks.bench_summ_down_pipeline
+"""
+
+import random
+import time
+
+from manager.tools.pipeline import run_pipeline
+
+# Seconds of simulated time per real second - keeps the benchmark short
+TIME_SCALE = 0.05
+VIDEO_COUNT = 5
+
+
+def make_videos(count: int, seed: int = 7) -> list[dict]:
+    """Build fake videos with per-stage latencies"""
+    rng = random.Random(seed)
+    return [
+        {
+            'index': i,
+            'url': f"https://www.youtube.com/shorts/video{i}",
+            'download': rng.uniform(3, 6),
+            'upload': rng.uniform(0.8, 1.5),
+            'processing': rng.uniform(4, 10),
+            'generate': rng.uniform(4, 6),
+        }
+        for i in range(count)
+    ]
+
+
+def download(video: dict) -> dict:
+    time.sleep(video['download'] * TIME_SCALE)
+    return video
+
+
+def upload(video: dict) -> dict:
+    time.sleep((video['upload'] + video['processing']) * TIME_SCALE)
+    return video
+
+
+def generate(video: dict) -> dict:
+    time.sleep(video['generate'] * TIME_SCALE)
+    return {'url': video['url'], 'analysis': {}}
+
+
+def run_serial(videos: list[dict]) -> list[dict]:
+    """The pre-pipeline summ_down: every stage of every video in sequence"""
+    return [generate(upload(download(video))) for video in videos]
+
+
+def run_staged(videos: list[dict], download_workers: int, upload_workers: int, analysis_workers: int) -> list[dict]:
+    return run_pipeline(videos, [
+        ('download', download, download_workers),
+        ('upload', upload, upload_workers),
+        ('analysis', generate, analysis_workers),
+    ])
+
+
+def timed(fn, *args) -> tuple[float, list]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    videos = make_videos(VIDEO_COUNT)
+    expected = [v['url'] for v in videos]
+    slowest = max(v['download'] + v['upload'] + v['processing'] + v['generate'] for v in videos) * TIME_SCALE
+
+    print(f"🎬 {VIDEO_COUNT} simulated videos, slowest single video: {slowest:.2f}s")
+    print("=" * 60)
+
+    serial_time, serial = timed(run_serial, videos)
+    assert [r['url'] for r in serial] == expected
+    print(f"{'serial loop':<28} {serial_time:6.2f}s")
+
+    for workers in [(1, 1, 1), (2, 3, 2), (5, 5, 5)]:
+        staged_time, staged = timed(run_staged, videos, *workers)
+        assert [r['url'] for r in staged] == expected, "pipeline must keep input order"
+        label = f"pipeline {workers[0]}/{workers[1]}/{workers[2]} workers"
+        print(f"{label:<28} {staged_time:6.2f}s  ({serial_time / staged_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from google.adk.agents import Agent
 from manager.tools.scrape_tiktok import scrape_tiktok
 from manager.tools.yt_scrapper import yt_scrapper
+from manager.tools.scrape_trends import scrape_trends
 from manager.tools.summ_down import summ_down
 from .sub_agent.trend_summarizer.agent import trend_summarizer
 
@@ -40,6 +41,7 @@ trend_analysis_agent = Agent(
         - google_scrapper (for retrieving top Google Trends)
         - yt_scrapper (for retrieving YouTube Shorts/Trends)
         - scrape_tiktok (for retrieving TikTok videos)
+        - scrape_trends (runs yt_scrapper and scrape_tiktok at the same time; prefer it whenever both are needed)
         - summ_down (for downloading videos and generating summaries with Gemini 2.5 Pro)
         - trend_summarizer (a sub-agent responsible for consolidating multiple video outputs into a single storytelling blueprint)
         
@@ -65,18 +67,14 @@ trend_analysis_agent = Agent(
            → Get the top 5 trending searches along with their search volumes.
         2. Present them to the user and ask:
            "Which keyword do you want to go with?"
-        3. Once a keyword is selected:
-           - Call yt_scrapper with:
-             {
-               "sterm": "<category>",
-               "short_c": 2,
-               "sorting": "POPULAR"
-             }
-           - Call scrape_tiktok with:
+        3. Once a keyword is selected, call scrape_trends once with:
              {
                "category": "<category>",
-               "region": "<region>"
+               "region": "<region>",
+               "sorting": "POPULAR",
+               "short_c": 2
              }
+           → Returns {"youtube": [...], "tiktok": [...]}.
         4. Collect 3 TikTok videos and 2 YouTube videos, then combine them into the unified structure:
            {
              "title": str,
@@ -91,18 +89,14 @@ trend_analysis_agent = Agent(
         Trigger: Input specifies a particular niche or category.
         
         Steps:
-        1. Directly call:
-           - yt_scrapper with:
+        1. Directly call scrape_trends once with:
              {
-               "sterm": "<category>",
-               "short_c": 2,
-               "sorting": "NEWEST"
-             }
-           - scrape_tiktok with:
-             {
-               "catagory": "<category>",
-               "region": "<region>"
+               "category": "<category>",
+               "region": "<region>",
+               "sorting": "NEWEST",
+               "short_c": 2
              }
+           → Returns {"youtube": [...], "tiktok": [...]}.
         2. Collect and combine the results from both tools into the unified structure:
            {
              "title": str,
@@ -178,7 +172,7 @@ trend_analysis_agent = Agent(
 
         """
     ),
-    tools =([scrape_tiktok,yt_scrapper, summ_down]),
+    tools =([scrape_trends, scrape_tiktok,yt_scrapper, summ_down]),
     output_key = "video_summary",
     sub_agents =([trend_summarizer]),
 )
@@ -0,0 +1,136 @@
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+import requests
+from dotenv import load_dotenv
+from manager.tools.media_download import get_session
+from manager.tools.sqlite_store import SQLiteStore
+from manager.tools.video_urls import parse_video_url
+
+load_dotenv()
+
+ACTOR_MEDIA_ENABLED = os.getenv("ACTOR_MEDIA_ENABLED", "true").lower() == "true"
+ACTOR_MEDIA_PATH = os.getenv(
+    "ACTOR_MEDIA_PATH",
+    str(Path.home() / ".cache" / "automation_agent" / "actor_media.sqlite3"),
+)
+# Apify keeps the default storages of a run for days; stop trusting a reference well before that
+ACTOR_MEDIA_TTL_HOURS = float(os.getenv("ACTOR_MEDIA_TTL_HOURS", "24"))
+# Size estimate for a stored video when its storage does not report one
+ACTOR_MEDIA_ESTIMATE_KBPS = float(os.getenv("ACTOR_MEDIA_ESTIMATE_KBPS", "2500"))
+
+API_TOKEN = os.getenv("APIFY_API_TOKEN")
+APIFY_API_HOSTS = {
+    host for host in ('api.apify.com', urlparse(os.getenv("APIFY_API_URL") or "").netloc) if host
+}
+
+
+def stored_media_url(item: dict) -> str | None:
+    """Media reference the TikTok actor stores when shouldDownloadVideos is on"""
+    # mediaUrls points into the actor's own storage; downloadAddr may be a TikTok CDN link
+    media_urls = item.get("mediaUrls") or []
+    video_meta = item.get("videoMeta") or {}
+    return (media_urls[0] if media_urls else None) or video_meta.get("downloadAddr")
+
+
+def auth_headers(media_url: str) -> dict:
+    """Authorization for records in Apify storages; other hosts get no extra headers"""
+    if API_TOKEN and urlparse(media_url).netloc in APIFY_API_HOSTS:
+        return {'Authorization': f"Bearer {API_TOKEN}"}
+    return {}
+
+
+def expected_size(media_url: str, duration: float = None) -> int | None:
+    """
+    Size of a stored video before downloading it.
+
+    Uses the storage's Content-Length, falling back to duration at
+    ACTOR_MEDIA_ESTIMATE_KBPS; None if neither is known.
+    """
+    try:
+        response = get_session(media_url).head(
+            media_url, headers=auth_headers(media_url), allow_redirects=True, timeout=10
+        )
+        if response.ok and response.headers.get('Content-Length'):
+            return int(response.headers['Content-Length'])
+    except (requests.RequestException, ValueError):
+        pass
+    if duration:
+        return int(duration * ACTOR_MEDIA_ESTIMATE_KBPS * 1000 / 8)
+    return None
+
+
+class ActorMediaIndex(SQLiteStore):
+    """
+    Index of video files that a scraper actor has already stored.
+
+    The index maps a platform video ID to the copy of the video in the
+    actor's storage. The scraper fills it in. summ_down reads it to download
+    that copy instead of resolving the video again with yt-dlp.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS actor_media (
+            key TEXT PRIMARY KEY,
+            media_url TEXT NOT NULL,
+            title TEXT,
+            duration REAL,
+            expires_at REAL NOT NULL
+        )""",
+    )
+
+    def __init__(self, path: str, ttl_seconds: float):
+        super().__init__(path, {'registered': 0, 'hits': 0, 'misses': 0, 'failed': 0})
+        self.ttl_seconds = ttl_seconds
+
+    def register(self, url: str, media_url: str, title: str = None, duration: float = None) -> bool:
+        """Remember the stored copy of the video at url; returns False if url has no video ID"""
+        parsed_id = parse_video_url(url) if url else None
+        if not parsed_id or not media_url:
+            return False
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO actor_media (key, media_url, title, duration, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (":".join(parsed_id), media_url, title, duration, time.time() + self.ttl_seconds),
+            )
+            conn.execute("DELETE FROM actor_media WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+
+        self.count(registered=1)
+        return True
+
+    def lookup(self, url: str) -> dict | None:
+        """
+        Find the stored copy of a video.
+
+        Returns:
+            dict | None: {'media_url', 'title', 'duration'} or None.
+        """
+        parsed_id = parse_video_url(url)
+        row = None
+        if parsed_id:
+            with self.connect() as conn:
+                row = conn.execute(
+                    "SELECT media_url, title, duration FROM actor_media WHERE key = ? AND expires_at >= ?",
+                    (":".join(parsed_id), time.time()),
+                ).fetchone()
+
+        self.count(**{'hits' if row else 'misses': 1})
+        if row is None:
+            return None
+        return {'media_url': row[0], 'title': row[1], 'duration': row[2]}
+
+    def forget(self, url: str):
+        """Drop a reference whose download failed, e.g. because the actor's storage expired"""
+        parsed_id = parse_video_url(url)
+        if not parsed_id:
+            return
+        with self.connect() as conn:
+            conn.execute("DELETE FROM actor_media WHERE key = ?", (":".join(parsed_id),))
+            conn.commit()
+        self.count(failed=1)
+
+
+actor_media = ActorMediaIndex(path=ACTOR_MEDIA_PATH, ttl_seconds=ACTOR_MEDIA_TTL_HOURS * 3600)
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+
+# No field defaults: Gemini's response_schema does not accept them
+
+
+class StorytellingBlueprint(BaseModel):
+    genre: str = Field(description="Genre of the video")
+    theme: str = Field(description="Central theme")
+    target_emotion: str = Field(description="Main emotion the video aims to trigger")
+    pov: str = Field(description="Point of view the story is told from")
+    setting: str = Field(description="Where the video takes place")
+    characters: list[str] = Field(description="Characters or people featured")
+    conflict: str = Field(description="Core conflict or tension")
+    escalating_stakes: str = Field(description="How the stakes rise during the video")
+    payoff: str = Field(description="Resolution or twist")
+
+
+class VideoAnalysis(BaseModel):
+    """Viral analysis of a single video"""
+    viral_ingredients: list[str] = Field(description="Elements that make the video go viral")
+    video_hooks: list[str] = Field(description="Hooks used, especially in the first seconds")
+    hook_pattern: str = Field(description="Concise description of the hook pattern")
+    summary: str = Field(description="Summary of the whole video")
+    storytelling_blueprint: StorytellingBlueprint
+
+
+class BatchVideoAnalysis(BaseModel):
+    video: int = Field(description="Number n of the \"VIDEO n\" label this analysis belongs to")
+    analysis: VideoAnalysis
+
+
+class TriageResult(BaseModel):
+    viral_score: float = Field(description="0-100, how strong and representative a viral example this video is")
+    analysis: VideoAnalysis
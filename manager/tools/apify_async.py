@@ -0,0 +1,314 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from apify_client import ApifyClientAsync
+from dotenv import load_dotenv
+from manager.tools.apify_cache import apify_cache, canonicalize, make_key, APIFY_CACHE_ENABLED
+
+load_dotenv()
+
+API_TOKEN = os.getenv("APIFY_API_TOKEN")
+# Alternative API endpoint, e.g. a proxy or a local stub; None for api.apify.com
+APIFY_API_URL = os.getenv("APIFY_API_URL") or None
+# Items per dataset request; reads that need fewer items ask for fewer
+APIFY_DATASET_PAGE_SIZE = int(os.getenv("APIFY_DATASET_PAGE_SIZE", "100"))
+# Reuse a run with identical input that finished within this window instead of starting one (0 disables)
+APIFY_RUN_REUSE_MINUTES = float(os.getenv("APIFY_RUN_REUSE_MINUTES", "10"))
+# How many of the actor's latest runs to compare inputs against
+APIFY_RUN_REUSE_SCAN = int(os.getenv("APIFY_RUN_REUSE_SCAN", "10"))
+
+# Actor runs in progress in this process, keyed by actor and normalized input (singleflight)
+_runs_lock = threading.Lock()
+_runs_in_flight = {}
+_run_stats = {'started': 0, 'reused': 0, 'attached': 0, 'joined': 0}
+
+# One client per event loop, dropped together with the loop. apify_client has no
+# close(); reusing the client keeps every actor call on a loop on one connection pool.
+_clients_lock = threading.Lock()
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> ApifyClientAsync:
+    """Async Apify client shared by every call on the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        api_url, client = _clients.get(loop, (None, None))
+        if client is None or api_url != APIFY_API_URL:
+            client = ApifyClientAsync(API_TOKEN, api_url=APIFY_API_URL)
+            _clients[loop] = (APIFY_API_URL, client)
+    return client
+
+
+async def stream_items(
+    client: ApifyClientAsync,
+    dataset_id: str,
+    fields: list[str] = None,
+    limit: int = None,
+    page_size: int = APIFY_DATASET_PAGE_SIZE,
+):
+    """
+    Yield dataset items page by page, requesting only the given fields.
+
+    Unlike DatasetClientAsync.iterate_items(), which asks for 1000 items per
+    request, pages are capped at page_size (and at limit), so a consumer that
+    stops early has not downloaded the rest of the dataset.
+
+    Args:
+        client (ApifyClientAsync): Client to read with.
+        dataset_id (str): Apify dataset ID.
+        fields (list[str]): Top-level fields to keep; None for the whole item.
+        limit (int): Stop after this many items; None for all of them.
+        page_size (int): Items per request.
+    """
+    dataset = client.dataset(dataset_id)
+    offset = 0
+    while limit is None or offset < limit:
+        count = page_size if limit is None else min(page_size, limit - offset)
+        page = await dataset.list_items(offset=offset, limit=count, fields=fields)
+        for item in page.items:
+            yield item
+        offset += len(page.items)
+        if len(page.items) < count:
+            break
+
+
+def _age_seconds(timestamp) -> float:
+    if timestamp is None:
+        return float('inf')
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    return time.time() - timestamp.timestamp()
+
+
+def _count_run(outcome: str):
+    with _runs_lock:
+        _run_stats[outcome] += 1
+
+
+async def find_recent_run(client: ApifyClientAsync, actor_id: str, run_input: dict) -> dict | None:
+    """
+    Find an existing run of the actor with the same input.
+
+    Only the latest APIFY_RUN_REUSE_SCAN runs are checked. A run qualifies if
+    it succeeded within APIFY_RUN_REUSE_MINUTES. A run that is still going
+    also qualifies, and is waited for. Inputs are compared on their
+    normalized form, read from each run's INPUT record.
+
+    Returns:
+        dict | None: The finished run, or None if a new run has to be started.
+    """
+    if APIFY_RUN_REUSE_MINUTES <= 0:
+        return None
+
+    wanted = canonicalize(run_input)
+    window = APIFY_RUN_REUSE_MINUTES * 60
+    try:
+        page = await client.actor(actor_id).runs().list(limit=APIFY_RUN_REUSE_SCAN, desc=True)
+        for run in page.items:
+            status = run.get('status')
+            if status == 'SUCCEEDED':
+                if _age_seconds(run.get('finishedAt')) > window:
+                    continue
+            elif status not in ('READY', 'RUNNING'):
+                continue
+
+            record = await client.key_value_store(run['defaultKeyValueStoreId']).get_record('INPUT')
+            if record is None or canonicalize(record.get('value')) != wanted:
+                continue
+
+            if status == 'SUCCEEDED':
+                print(f"♻️ Reusing actor run {run['id']} of {actor_id} "
+                      f"(finished {_age_seconds(run.get('finishedAt')) / 60:.1f} min ago)")
+                _count_run('reused')
+                return run
+
+            print(f"🔗 Attaching to actor run {run['id']} of {actor_id}, already in progress")
+            finished = await client.run(run['id']).wait_for_finish()
+            if finished is not None and finished.get('status') == 'SUCCEEDED':
+                _count_run('attached')
+                return finished
+    except Exception as e:
+        print(f"⚠️ Could not look up recent runs of {actor_id}: {str(e)}")
+    return None
+
+
+async def obtain_run(client: ApifyClientAsync, actor_id: str, run_input: dict) -> dict:
+    """
+    Return a finished run of the actor for this input, starting one only if needed.
+
+    Concurrent callers with the same actor and normalized input share one run:
+    the first caller looks for a reusable run or starts one, and the others
+    wait for it (singleflight).
+    """
+    key = make_key(actor_id, run_input)
+    with _runs_lock:
+        future = _runs_in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _runs_in_flight[key] = future
+        else:
+            _run_stats['joined'] += 1
+
+    if not leader:
+        print(f"🔗 Joining in-flight run of actor {actor_id}")
+        # shield: a cancelled waiter must not cancel the run for the others
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    try:
+        run = await find_recent_run(client, actor_id, run_input)
+        if run is None:
+            # logger=None: do not stream the actor's log and status messages while waiting
+            run = await client.actor(actor_id).call(run_input=run_input, logger=None)
+            if run is None:
+                raise RuntimeError(f"Apify actor {actor_id} did not return a run")
+            _count_run('started')
+        future.set_result(run)
+        return run
+    except BaseException as e:
+        future.set_exception(e if isinstance(e, Exception) else RuntimeError(f"Run of actor {actor_id} was cancelled"))
+        raise
+    finally:
+        with _runs_lock:
+            _runs_in_flight.pop(key, None)
+
+
+def run_stats() -> dict:
+    """Actor runs started, reused or shared since process start"""
+    with _runs_lock:
+        return dict(_run_stats)
+
+
+async def execute_actor(
+    actor_id: str,
+    run_input: dict,
+    fields: list[str] = None,
+    limit: int = None,
+    keep=None,
+) -> tuple[list[dict], dict]:
+    """Get a finished run for the input (shared, reused or new) and read its dataset; returns (items, run)"""
+    client = get_async_client()
+    start = time.perf_counter()
+
+    run = await obtain_run(client, actor_id, run_input)
+
+    items = []
+    # Without a filter the server can apply the limit; with one, read small pages until enough items pass
+    page_limit = limit if keep is None else None
+    page_size = min(limit, APIFY_DATASET_PAGE_SIZE) if limit else APIFY_DATASET_PAGE_SIZE
+    async for item in stream_items(client, run["defaultDatasetId"], fields, page_limit, page_size):
+        if keep is not None and not keep(item):
+            continue
+        items.append(item)
+        if limit is not None and len(items) >= limit:
+            break
+    print(f"🕷️ Actor {actor_id} finished in {time.perf_counter() - start:.1f}s ({len(items)} items)")
+    return items, run
+
+
+async def run_actor(
+    actor_id: str,
+    run_input: dict,
+    fields: list[str] = None,
+    limit: int = None,
+    keep=None,
+    cache_ttl_seconds: float = None,
+) -> list[dict]:
+    """
+    Run an Apify actor to completion without blocking the event loop.
+
+    Results are served from the Apify result cache while fresh. A stale
+    result is returned at once and refreshed by a background run.
+
+    Args:
+        actor_id (str): Apify actor ID.
+        run_input (dict): Actor input.
+        fields (list[str]): Only fetch these top-level item fields (None for whole items).
+        limit (int): Stop reading the dataset once this many items were kept (None for all).
+        keep (callable): Optional item filter; items it rejects do not count towards limit.
+            Must behave the same for every call to the same actor, as it is not part of the cache key.
+        cache_ttl_seconds (float): How long this actor's results stay fresh (None for the default).
+
+    Returns:
+        list[dict]: Items of the run's default dataset.
+    """
+    if not APIFY_CACHE_ENABLED:
+        items, _ = await execute_actor(actor_id, run_input, fields, limit, keep)
+        return items
+
+    cache_key = make_key(actor_id, run_input, fields, limit)
+
+    async def refresh() -> list[dict]:
+        items, run = await execute_actor(actor_id, run_input, fields, limit, keep)
+        # An empty dataset is more likely a failed scrape than "nothing is trending"
+        if items:
+            apify_cache.put(cache_key, actor_id, items, run, cache_ttl_seconds)
+        return items
+
+    try:
+        state, items = apify_cache.get(cache_key)
+    except Exception as e:
+        print(f"⚠️ Apify cache read failed: {str(e)}")
+        state, items = 'miss', None
+
+    if state == 'fresh':
+        print(f"💾 Apify cache hit for actor {actor_id} ({len(items)} items)")
+        return items
+    if state == 'stale':
+        print(f"💾 Apify cache hit for actor {actor_id} (stale, refreshing in background)")
+        apify_cache.revalidate(cache_key, refresh)
+        return items
+
+    return await refresh()
+
+
+async def gather_actors(calls: dict) -> dict[str, list]:
+    """
+    Await several scraper coroutines at once.
+
+    Every actor run is started before any of them is awaited, so the total
+    wait is the slowest actor rather than the sum of all of them. A failing
+    scraper yields an empty list instead of failing the others.
+
+    Args:
+        calls (dict): Name -> coroutine, e.g. {'youtube': yt_scrapper_async(...)}.
+
+    Returns:
+        dict[str, list]: Name -> scraper result.
+    """
+    names = list(calls)
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*calls.values(), return_exceptions=True)
+
+    results = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"⚠️ {name} scraper failed: {str(outcome)}")
+            results[name] = []
+        else:
+            results[name] = outcome
+    print(f"⏱️ Fetched {', '.join(names)} concurrently in {time.perf_counter() - start:.1f}s")
+    stats = run_stats()
+    print(f"🕷️ Apify runs: {stats['started']} started, {stats['reused']} reused, "
+          f"{stats['attached'] + stats['joined']} shared")
+    if APIFY_CACHE_ENABLED:
+        stats = apify_cache.stats()
+        print(f"💾 Apify cache: {stats['hits']} fresh / {stats['stale_hits']} stale hits, "
+              f"{stats['misses']} misses, {stats['compute_units_saved']:.3f} CU saved")
+    return results
+
+
+def run_sync(coro):
+    """Run a coroutine from synchronous code, also when called inside a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # asyncio.run() refuses to nest, so give the coroutine a loop of its own
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from manager.tools.sqlite_store import SQLiteStore, evict_lru
+
+load_dotenv()
+
+APIFY_CACHE_ENABLED = os.getenv("APIFY_CACHE_ENABLED", "true").lower() == "true"
+APIFY_CACHE_PATH = os.getenv(
+    "APIFY_CACHE_PATH",
+    str(Path.home() / ".cache" / "automation_agent" / "apify_cache.sqlite3"),
+)
+# Default freshness for actors that do not set their own
+APIFY_CACHE_TTL_MINUTES = float(os.getenv("APIFY_CACHE_TTL_MINUTES", "20"))
+# Per-actor overrides, e.g. "h7sDV53CddomktSi5=15,nWhM7vTPu16lcwuIg=30"
+APIFY_CACHE_ACTOR_TTLS = os.getenv("APIFY_CACHE_ACTOR_TTLS", "")
+# After the TTL, serve the old result for this long while a background run refreshes it
+APIFY_CACHE_STALE_MINUTES = float(os.getenv("APIFY_CACHE_STALE_MINUTES", "5"))
+APIFY_CACHE_MAX_ENTRIES = int(os.getenv("APIFY_CACHE_MAX_ENTRIES", "500"))
+
+
+def parse_actor_ttls(spec: str) -> dict[str, float]:
+    """Parse "actor_id=minutes,..." into {actor_id: seconds}"""
+    ttls = {}
+    for entry in spec.split(","):
+        actor_id, _, minutes = entry.partition("=")
+        if actor_id.strip() and minutes.strip():
+            ttls[actor_id.strip()] = float(minutes) * 60
+    return ttls
+
+
+def canonicalize(value):
+    """
+    Normalize an actor input so equivalent inputs compare equal (key order, nulls, surrounding whitespace).
+
+    Case is kept: URLs, IDs and enum values in actor inputs are case-sensitive.
+    """
+    if isinstance(value, dict):
+        return {k: canonicalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def make_key(actor_id: str, run_input: dict, fields: list[str] = None, limit: int = None) -> str:
+    """Cache key for an actor call and the projection of its dataset that was read"""
+    payload = json.dumps(
+        [actor_id, canonicalize(run_input), fields, limit], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ApifyResultCache(SQLiteStore):
+    """
+    Persistent cache of Apify actor results keyed by actor ID and normalized input.
+
+    A result is fresh for its actor's TTL. For a further stale window it is
+    still returned immediately, and one background run per key refreshes it
+    (stale-while-revalidate). Hits record the run time, compute units and
+    cost of the actor run they replaced.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS apify_results (
+            key TEXT PRIMARY KEY,
+            actor_id TEXT NOT NULL,
+            value TEXT NOT NULL,
+            run_seconds REAL NOT NULL DEFAULT 0,
+            compute_units REAL NOT NULL DEFAULT 0,
+            usage_usd REAL NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            fresh_until REAL NOT NULL,
+            stale_until REAL NOT NULL,
+            last_access REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_apify_results_last_access ON apify_results (last_access)",
+    )
+
+    def __init__(self, path: str, default_ttl_seconds: float, actor_ttls: dict[str, float],
+                 stale_seconds: float, max_entries: int):
+        super().__init__(path, {
+            'hits': 0, 'stale_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0,
+            'refreshes': 0, 'refresh_failures': 0,
+            'run_seconds_saved': 0.0, 'compute_units_saved': 0.0, 'usd_saved': 0.0,
+        })
+        self.default_ttl_seconds = default_ttl_seconds
+        self.actor_ttls = actor_ttls
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+
+        self._refreshing = set()
+
+    def ttl_for(self, actor_id: str, default: float = None) -> float:
+        """Freshness in seconds: env override, then the caller's default, then the global default"""
+        if actor_id in self.actor_ttls:
+            return self.actor_ttls[actor_id]
+        return default if default is not None else self.default_ttl_seconds
+
+    def get(self, key: str) -> tuple[str, list | None]:
+        """
+        Look up a cached actor result.
+
+        Returns:
+            tuple[str, list | None]: ('fresh', items), ('stale', items) or ('miss', None).
+        """
+        now = time.time()
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT value, run_seconds, compute_units, usage_usd, fresh_until, stale_until "
+                "FROM apify_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now > row[5]:
+                conn.execute("DELETE FROM apify_results WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            elif row is not None:
+                conn.execute("UPDATE apify_results SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+
+        if row is None:
+            self.count(misses=1)
+            return 'miss', None
+
+        value, run_seconds, compute_units, usage_usd, fresh_until, _ = row
+        state = 'fresh' if now <= fresh_until else 'stale'
+        self.count(**{'hits' if state == 'fresh' else 'stale_hits': 1}, run_seconds_saved=run_seconds,
+                   compute_units_saved=compute_units, usd_saved=usage_usd)
+        return state, json.loads(value)
+
+    def put(self, key: str, actor_id: str, items: list, run: dict = None, ttl_seconds: float = None):
+        """Store an actor result along with what its run cost, and evict least recently used entries"""
+        run = run or {}
+        run_stats = run.get('stats') or {}
+        now = time.time()
+        fresh_until = now + self.ttl_for(actor_id, ttl_seconds)
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO apify_results (key, actor_id, value, run_seconds, compute_units, "
+                "usage_usd, created_at, fresh_until, stale_until, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, actor_id, json.dumps(items), float(run_stats.get('runTimeSecs') or 0),
+                 float(run_stats.get('computeUnits') or 0), float(run.get('usageTotalUsd') or 0),
+                 now, fresh_until, fresh_until + self.stale_seconds, now),
+            )
+            conn.execute("DELETE FROM apify_results WHERE stale_until < ?", (now,))
+            evicted = evict_lru(conn, "apify_results", self.max_entries)
+            conn.commit()
+
+        self.count(stores=1, evictions=evicted)
+
+    def revalidate(self, key: str, refresh) -> bool:
+        """
+        Refresh a stale entry in the background unless a refresh for it is already running.
+
+        The refresh runs on its own thread and event loop, so it survives the
+        caller's loop being closed (e.g. by asyncio.run in a sync wrapper).
+
+        Args:
+            key (str): Cache key being refreshed.
+            refresh (callable): Zero-argument coroutine function that re-runs the actor
+                and stores the result.
+
+        Returns:
+            bool: True if a refresh was started.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._stats['refreshes'] += 1
+
+        def run():
+            try:
+                asyncio.run(refresh())
+            except Exception as e:
+                print(f"⚠️ Background Apify refresh failed: {str(e)}")
+                self.count(refresh_failures=1)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="apify-cache-refresh", daemon=True).start()
+        return True
+
+    def stats(self) -> dict:
+        """Hit/miss counters and avoided actor cost since process start"""
+        stats = super().stats()
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+apify_cache = ApifyResultCache(
+    path=APIFY_CACHE_PATH,
+    default_ttl_seconds=APIFY_CACHE_TTL_MINUTES * 60,
+    actor_ttls=parse_actor_ttls(APIFY_CACHE_ACTOR_TTLS),
+    stale_seconds=APIFY_CACHE_STALE_MINUTES * 60,
+    max_entries=APIFY_CACHE_MAX_ENTRIES,
+)
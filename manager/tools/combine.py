@@ -16,6 +16,8 @@ import google.generativeai as genai
 from typing import List, Dict
 from dotenv import load_dotenv
 
+from manager.tools.gemini_files import gemini_files, wait_for_processing, GEMINI_FILE_REGISTRY_ENABLED
+
 # Configuration - Set your API key here
 load_dotenv()
 
@@ -134,18 +136,16 @@ def summ_down(video_urls: List[str]) -> List[Dict[str, str]]:
                 print(f"🤖 Generating AI summary for: {Path(video_path).name}")
 
                 # Upload video to Gemini
-                video_file = genai.upload_file(path=video_path)
+                if GEMINI_FILE_REGISTRY_ENABLED:
+                    # Reuses a live upload of the same file
+                    video_file = gemini_files.upload(video_path)
+                else:
+                    video_file = wait_for_processing(genai.upload_file(path=video_path))
+                    if video_file.state.name == "FAILED":
+                        genai.delete_file(video_file.name)
+                        raise ValueError("Video processing failed")
                 print("📤 Video uploaded to Gemini")
 
-                # Wait for processing
-                while video_file.state.name == "PROCESSING":
-                    print("⏳ Processing video...")
-                    time.sleep(2)
-                    video_file = genai.get_file(video_file.name)
-
-                if video_file.state.name == "FAILED":
-                    raise ValueError("Video processing failed")
-
                 # Generate summary
                 prompt = """
                 Analyze this video and provide a comprehensive summary including:
@@ -158,11 +158,15 @@ def summ_down(video_urls: List[str]) -> List[Dict[str, str]]:
                 Keep the summary concise but informative (2-3 paragraphs maximum).
                 """
 
-                response = self.model.generate_content([video_file, prompt])
-
-                # Clean up uploaded file
-                genai.delete_file(video_file.name)
-                print("🗑️ Cleaned up uploaded file from Gemini")
+                try:
+                    response = self.model.generate_content([video_file, prompt])
+                finally:
+                    if GEMINI_FILE_REGISTRY_ENABLED:
+                        # Registered files are kept for reuse, anything else is deleted
+                        gemini_files.release(video_file)
+                    else:
+                        genai.delete_file(video_file.name)
+                        print("🗑️ Cleaned up uploaded file from Gemini")
 
                 return {
                     'url': url,
@@ -0,0 +1,337 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+import google.generativeai as genai
+from dotenv import load_dotenv
+from manager.tools.sqlite_store import SQLiteStore
+
+load_dotenv()
+
+GEMINI_FILE_REGISTRY_ENABLED = os.getenv("GEMINI_FILE_REGISTRY_ENABLED", "true").lower() == "true"
+GEMINI_FILE_REGISTRY_PATH = os.getenv(
+    "GEMINI_FILE_REGISTRY_PATH",
+    str(Path.home() / ".cache" / "automation_agent" / "gemini_files.sqlite3"),
+)
+# Do not reuse a file that expires within this margin (Gemini keeps uploads for 48 hours)
+GEMINI_FILE_REUSE_MARGIN_MINUTES = float(os.getenv("GEMINI_FILE_REUSE_MARGIN_MINUTES", "60"))
+GEMINI_JANITOR_INTERVAL_MINUTES = float(os.getenv("GEMINI_JANITOR_INTERVAL_MINUTES", "30"))
+# Untracked files younger than this may still be mid-upload in another process
+GEMINI_JANITOR_MIN_AGE_MINUTES = float(os.getenv("GEMINI_JANITOR_MIN_AGE_MINUTES", "60"))
+# Bytes the registry may keep on Gemini for reuse; the File API quota is 20 GB per project
+GEMINI_FILE_REGISTRY_MAX_BYTES = int(float(os.getenv("GEMINI_FILE_REGISTRY_MAX_MB", "10240")) * 1024 * 1024)
+# Registry uploads are named "<prefix>:<registry id>:<hash>"; the janitor only deletes files
+# carrying its own registry's tag, never those of other hosts or apps sharing the API key
+GEMINI_FILE_DISPLAY_PREFIX = os.getenv("GEMINI_FILE_DISPLAY_PREFIX", "automation_agent")
+# Assumed lifetime when the API does not report an expiration time
+GEMINI_FILE_TTL_SECONDS = 48 * 3600
+
+HASH_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Content hash of a local file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def wait_for_processing(video_file: object, poll_seconds: float = 2, cancel_event: threading.Event = None) -> object:
+    """Poll an uploaded file until Gemini has finished processing it, or until cancel_event is set"""
+    processing_time = 0
+    while video_file.state.name == "PROCESSING":
+        if cancel_event is None:
+            time.sleep(poll_seconds)
+        elif cancel_event.wait(poll_seconds):
+            raise TimeoutError(f"Gave up waiting for {video_file.name} to finish processing")
+        processing_time += poll_seconds
+        video_file = genai.get_file(video_file.name)
+        print(f"   Processing {video_file.name}... ({processing_time:.0f}s elapsed)")
+    return video_file
+
+
+class GeminiFileRegistry(SQLiteStore):
+    """
+    Local registry of live Gemini uploads keyed by content hash.
+
+    Uploading the same bytes again returns the file that is already on Gemini
+    instead of re-uploading it, until shortly before the file expires. A
+    background janitor deletes files this registry uploaded but no longer
+    tracks, e.g. uploads leaked by a crashed run. Uploads are tagged with the
+    registry's ID in their display name, so files of other registries sharing
+    the API key are left alone. Kept files are bounded by max_bytes, evicting
+    the oldest ones that are not in use by this process.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS gemini_files (
+            content_hash TEXT PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            expires_at REAL NOT NULL,
+            created_at REAL NOT NULL
+        )""",
+        "CREATE TABLE IF NOT EXISTS registry_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    )
+
+    def __init__(self, path: str, reuse_margin_seconds: float, janitor_min_age_seconds: float, max_bytes: int):
+        super().__init__(path, {'uploads': 0, 'reused': 0, 'bytes_saved': 0, 'purged': 0, 'evicted': 0})
+        self.reuse_margin_seconds = reuse_margin_seconds
+        self.janitor_min_age_seconds = janitor_min_age_seconds
+        self.max_bytes = max_bytes
+
+        self._hash_locks = {}
+        # Files handed out by upload() and not released yet: name -> count
+        self._leases = {}
+        self._registry_id = None
+        self._janitor = None
+        self._janitor_stop = threading.Event()
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        super()._init_schema(conn)
+        conn.execute("INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('id', ?)", (uuid.uuid4().hex[:12],))
+        self._registry_id = conn.execute("SELECT value FROM registry_meta WHERE key = 'id'").fetchone()[0]
+
+    def owner_prefix(self) -> str:
+        """Display name prefix of the files uploaded through this registry"""
+        if self._registry_id is None:
+            with self.connect():
+                pass
+        return f"{GEMINI_FILE_DISPLAY_PREFIX}:{self._registry_id}:"
+
+    def _hash_lock(self, content_hash: str) -> threading.Lock:
+        with self._lock:
+            return self._hash_locks.setdefault(content_hash, threading.Lock())
+
+    def lookup(self, content_hash: str) -> str | None:
+        """Return the Gemini file name registered for a hash if it is not about to expire"""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT name, expires_at FROM gemini_files WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        if row is None or row[1] - time.time() < self.reuse_margin_seconds:
+            return None
+        return row[0]
+
+    def register(self, content_hash: str, video_file: object):
+        expiration = getattr(video_file, 'expiration_time', None)
+        expires_at = expiration.timestamp() if expiration else time.time() + GEMINI_FILE_TTL_SECONDS
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO gemini_files (content_hash, name, size_bytes, expires_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (content_hash, video_file.name, int(getattr(video_file, 'size_bytes', 0) or 0),
+                 expires_at, time.time()),
+            )
+            conn.commit()
+
+    def forget(self, name: str):
+        with self.connect() as conn:
+            conn.execute("DELETE FROM gemini_files WHERE name = ?", (name,))
+            conn.commit()
+
+    def tracked_names(self) -> set[str]:
+        with self.connect() as conn:
+            return {row[0] for row in conn.execute("SELECT name FROM gemini_files")}
+
+    def is_tracked(self, name: str) -> bool:
+        with self.connect() as conn:
+            return conn.execute("SELECT 1 FROM gemini_files WHERE name = ?", (name,)).fetchone() is not None
+
+    def _lease(self, name: str):
+        with self._lock:
+            self._leases[name] = self._leases.get(name, 0) + 1
+
+    def _unlease(self, name: str):
+        with self._lock:
+            count = self._leases.pop(name, 0) - 1
+            if count > 0:
+                self._leases[name] = count
+
+    def evict_over_cap(self) -> int:
+        """
+        Delete the oldest registered files until the registry fits in max_bytes.
+
+        Files leased by this process are skipped.
+
+        Returns:
+            int: Number of Gemini files deleted.
+        """
+        with self.connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM gemini_files").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute("SELECT name, size_bytes FROM gemini_files ORDER BY created_at").fetchall()
+
+        with self._lock:
+            leased = set(self._leases)
+        evicted = 0
+        for name, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            if name in leased:
+                continue
+            try:
+                genai.delete_file(name)
+            except Exception as e:
+                print(f"⚠️ Could not evict Gemini file {name}: {str(e)}")
+            self.forget(name)
+            total -= size_bytes
+            evicted += 1
+
+        self.count(evicted=evicted)
+        if evicted:
+            print(f"🧹 Evicted {evicted} Gemini file(s) to stay under {self.max_bytes / 1024 / 1024:.0f} MB")
+        return evicted
+
+    def upload(self, path: str, cancel_event: threading.Event = None) -> object:
+        """
+        Upload a local file to Gemini, or reuse the live upload of identical content.
+
+        Args:
+            path (str): Local media file.
+            cancel_event (threading.Event): Stop waiting for PROCESSING once set.
+
+        Returns:
+            genai File in the ACTIVE state.
+        """
+        content_hash = file_sha256(path)
+
+        # One upload per hash at a time; concurrent callers reuse the first one
+        with self._hash_lock(content_hash):
+            name = self.lookup(content_hash)
+            if name:
+                try:
+                    video_file = wait_for_processing(genai.get_file(name))
+                    if video_file.state.name == "ACTIVE":
+                        print(f"♻️ Reusing Gemini file {name}")
+                        self.count(reused=1, bytes_saved=Path(path).stat().st_size)
+                        self._lease(video_file.name)
+                        return video_file
+                except Exception as e:
+                    print(f"⚠️ Registered Gemini file {name} is gone: {str(e)}")
+                self.forget(name)
+
+            print(f"☁️ Uploading video to Gemini: {Path(path).name}")
+            video_file = genai.upload_file(path=path, display_name=f"{self.owner_prefix()}{content_hash[:16]}")
+            print(f"✅ Upload successful, file ID: {video_file.name}")
+
+            print("⏳ Waiting for Gemini processing...")
+            try:
+                video_file = wait_for_processing(video_file, cancel_event=cancel_event)
+            except TimeoutError:
+                genai.delete_file(video_file.name)
+                raise
+            if video_file.state.name == "FAILED":
+                print("❌ Gemini video processing failed")
+                genai.delete_file(video_file.name)
+                raise ValueError("Video processing failed")
+
+            self.register(content_hash, video_file)
+            self._lease(video_file.name)
+            self.count(uploads=1)
+            print(f"✅ Gemini processing complete: {video_file.name}")
+
+        try:
+            self.evict_over_cap()
+        except Exception as e:
+            print(f"⚠️ Gemini file eviction failed: {str(e)}")
+        return video_file
+
+    def release(self, video_file: object):
+        """Delete a file after use unless the registry keeps it for reuse"""
+        self._unlease(video_file.name)
+        if self.is_tracked(video_file.name):
+            return
+        print("🗑️ Cleaning up Gemini file...")
+        try:
+            genai.delete_file(video_file.name)
+            print("✅ Gemini file deleted")
+        except Exception as e:
+            print(f"⚠️ Failed to delete Gemini file: {str(e)}")
+
+    def purge_orphans(self) -> int:
+        """
+        Delete files uploaded through this registry that it no longer tracks, and drop expired rows.
+
+        Files without this registry's display name prefix belong to other hosts
+        or apps using the same API key and are never touched.
+
+        Returns:
+            int: Number of Gemini files deleted.
+        """
+        now = time.time()
+        with self.connect() as conn:
+            conn.execute("DELETE FROM gemini_files WHERE expires_at < ?", (now,))
+            conn.commit()
+
+        tracked = self.tracked_names()
+        prefix = self.owner_prefix()
+        live = set()
+        purged = 0
+        for video_file in genai.list_files():
+            live.add(video_file.name)
+            if video_file.name in tracked or not (getattr(video_file, 'display_name', '') or '').startswith(prefix):
+                continue
+            created = getattr(video_file, 'create_time', None)
+            if created and now - created.timestamp() < self.janitor_min_age_seconds:
+                continue
+            try:
+                genai.delete_file(video_file.name)
+                purged += 1
+            except Exception as e:
+                print(f"⚠️ Janitor could not delete {video_file.name}: {str(e)}")
+
+        # Registry rows whose file was deleted elsewhere
+        for name in tracked - live:
+            self.forget(name)
+
+        self.count(purged=purged)
+        if purged:
+            print(f"🧹 Janitor purged {purged} orphaned Gemini file(s)")
+
+        self.evict_over_cap()
+        return purged
+
+    def start_janitor(self, interval_seconds: float = GEMINI_JANITOR_INTERVAL_MINUTES * 60):
+        """Run purge_orphans now and then periodically in a daemon thread (idempotent)"""
+        with self._lock:
+            if self._janitor is not None and self._janitor.is_alive():
+                return
+            first_start = self._janitor is None
+            self._janitor_stop.clear()
+            self._janitor = threading.Thread(
+                target=self._janitor_loop, args=(interval_seconds,), name="gemini-file-janitor", daemon=True
+            )
+            self._janitor.start()
+        if first_start:
+            atexit.register(self.stop_janitor)
+
+    def stop_janitor(self, timeout: float = 10):
+        """Stop the janitor and let a purge in progress finish (registered with atexit)"""
+        self._janitor_stop.set()
+        janitor = self._janitor
+        if janitor is not None and janitor is not threading.current_thread():
+            janitor.join(timeout)
+
+    def _janitor_loop(self, interval_seconds: float):
+        while not self._janitor_stop.is_set():
+            try:
+                self.purge_orphans()
+            except Exception as e:
+                print(f"⚠️ Gemini file janitor failed: {str(e)}")
+            self._janitor_stop.wait(interval_seconds)
+
+
+gemini_files = GeminiFileRegistry(
+    path=GEMINI_FILE_REGISTRY_PATH,
+    reuse_margin_seconds=GEMINI_FILE_REUSE_MARGIN_MINUTES * 60,
+    janitor_min_age_seconds=GEMINI_JANITOR_MIN_AGE_MINUTES * 60,
+    max_bytes=GEMINI_FILE_REGISTRY_MAX_BYTES,
+)
@@ -1,27 +1,13 @@
-from apify_client import ApifyClient
-import os
-from dotenv import load_dotenv
+from manager.tools.apify_async import run_actor, run_sync
 
-load_dotenv()
+ACTOR_ID = "nWhM7vTPu16lcwuIg"
+TOP_TRENDS = 5
+# Google refreshes trending searches roughly every half hour
+CACHE_TTL_SECONDS = 30 * 60
 
-API_TOKEN = os.getenv("APIFY_API_TOKEN")
-client = ApifyClient(API_TOKEN)
 
-def google_scrapper(country: str, timeframe: str)-> list[dict]:
-    """
-    Fetch trending Google searches for a given category and timeframe.
-
-    Args:
-        Country (str): The category for trending searches (example: 'all', 'sports', 'business').
-        timeframe (str): Timeframe in hours or days (example: '24', '7d', '30d').
-
-    Returns:
-        list: A list of trending search data.
-    """
-
-
-    # Prepare the Actor input
-    run_input = {
+def build_run_input(country: str, timeframe: str) -> dict:
+    return {
         "enableTrendingSearches": True,
         "fetchRegionalData": False,
         "proxyConfiguration": {
@@ -33,22 +19,54 @@ def google_scrapper(country: str, timeframe: str)-> list[dict]:
         "rendingSearchesCountry": country      # New category field
     }
 
-    # Run the Actor and wait for it to finish
-    run = client.actor("nWhM7vTPu16lcwuIg").call(run_input=run_input)
+
+async def google_scrapper_async(country: str, timeframe: str) -> list[dict]:
+    """
+    Fetch trending Google searches without blocking the event loop.
+
+    Args:
+        Country (str): The category for trending searches (example: 'all', 'sports', 'business').
+        timeframe (str): Timeframe in hours or days (example: '24', '7d', '30d').
+
+    Returns:
+        list: A list of trending search data.
+    """
+    # Run the Actor and read only the first item that carries trending searches
+    items = await run_actor(
+        ACTOR_ID,
+        build_run_input(country, timeframe),
+        fields=["trending_searches"],
+        limit=1,
+        keep=lambda item: "trending_searches" in item,
+        cache_ttl_seconds=CACHE_TTL_SECONDS,
+    )
 
     # Fetch and return Actor results from the run's dataset
     results = []
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-        if "trending_searches" in item:
-            top_5 = item["trending_searches"][:5]
-            for trend in top_5:
-                results.append({
-                    "term": trend["term"],
-                    "volume": trend["trend_volume"]
-                })
+    for item in items:
+        top_5 = item["trending_searches"][:TOP_TRENDS]
+        for trend in top_5:
+            results.append({
+                "term": trend["term"],
+                "volume": trend["trend_volume"]
+            })
 
     return results
 
+
+def google_scrapper(country: str, timeframe: str)-> list[dict]:
+    """
+    Fetch trending Google searches for a given category and timeframe.
+
+    Args:
+        Country (str): The category for trending searches (example: 'all', 'sports', 'business').
+        timeframe (str): Timeframe in hours or days (example: '24', '7d', '30d').
+
+    Returns:
+        list: A list of trending search data.
+    """
+    return run_sync(google_scrapper_async(country, timeframe))
+
 # # Example usage:
 # if __name__ == "__main__":
 #     trending_data = google_scrapper(country="US", timeframe="24")
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Ceiling on media bytes held in memory at once across all summ_down workers
+MEDIA_MEMORY_BUDGET_BYTES = int(float(os.getenv("MEDIA_MEMORY_BUDGET_MB", "256")) * 1024 * 1024)
+# How long a worker waits for budget before spilling the item to disk instead
+MEDIA_BUDGET_WAIT_SECONDS = float(os.getenv("MEDIA_BUDGET_WAIT_SECONDS", "30"))
+
+
+class ByteBudget:
+    """
+    Process-wide byte semaphore for media buffered in memory.
+
+    acquire() blocks while admitting the item would push the total over the
+    ceiling, which applies backpressure to the stage producing in-memory
+    media. When it gives up (or the item can never fit) the caller keeps the
+    media on disk instead.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._stats = {'admitted': 0, 'spilled': 0, 'waited': 0, 'wait_seconds': 0.0, 'peak_bytes': 0}
+
+    def acquire(self, size: int, timeout: float = MEDIA_BUDGET_WAIT_SECONDS) -> bool:
+        """
+        Reserve size bytes of the budget.
+
+        Args:
+            size (int): Bytes the caller is about to hold in memory.
+            timeout (float): Seconds to wait for other items to be released.
+
+        Returns:
+            bool: True if admitted (call release() later), False if the item should
+                stay on disk.
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if size > self.max_bytes:
+                self._stats['spilled'] += 1
+                return False
+
+            waited = False
+            while self._in_use + size > self.max_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['spilled'] += 1
+                    self._stats['wait_seconds'] += time.perf_counter() - start
+                    return False
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += size
+            self._stats['admitted'] += 1
+            self._stats['peak_bytes'] = max(self._stats['peak_bytes'], self._in_use)
+            if waited:
+                self._stats['waited'] += 1
+                self._stats['wait_seconds'] += time.perf_counter() - start
+            return True
+
+    def release(self, size: int):
+        with self._cond:
+            self._in_use = max(self._in_use - size, 0)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Current and peak usage plus admission counters since process start"""
+        with self._cond:
+            return {**self._stats, 'in_use_bytes': self._in_use, 'max_bytes': self.max_bytes}
+
+
+media_budget = ByteBudget(MEDIA_MEMORY_BUDGET_BYTES)
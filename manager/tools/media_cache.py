@@ -0,0 +1,167 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+from manager.tools.media_staging import has_room
+from manager.tools.sqlite_store import SQLiteStore
+
+load_dotenv()
+
+MEDIA_CACHE_ENABLED = os.getenv("MEDIA_CACHE_ENABLED", "true").lower() == "true"
+MEDIA_CACHE_DIR = os.getenv(
+    "MEDIA_CACHE_DIR",
+    str(Path.home() / ".cache" / "automation_agent" / "media"),
+)
+MEDIA_CACHE_MAX_BYTES = int(float(os.getenv("MEDIA_CACHE_MAX_MB", "4096")) * 1024 * 1024)
+
+
+def _link_or_copy(src: Path, dest: Path):
+    """Hard link when source and destination share a filesystem, copy otherwise"""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class MediaCache(SQLiteStore):
+    """
+    Local cache of downloaded source videos keyed by (platform, video_id, format).
+
+    Files are stored under the hash of their key and written through a temp
+    file plus rename, so concurrent workers never see a partial file. The
+    total size is bounded by evicting the least recently used videos.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS media (
+            key TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            title TEXT,
+            duration REAL,
+            last_access REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_media_last_access ON media (last_access)",
+    )
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        super().__init__(self.root / "index.sqlite3", {
+            'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_served': 0,
+        })
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(platform: str, video_id: str, fmt: str) -> str:
+        return f"{platform}:{video_id}:{fmt}"
+
+    def fetch(self, platform: str, video_id: str, fmt: str, dest_dir: str) -> dict | None:
+        """
+        Place the cached video in dest_dir as "<platform>_<video_id>.<ext>".
+
+        Any failure to read the index or place the file (e.g. a full staging
+        directory) counts as a miss, so the caller downloads the video instead.
+
+        Returns:
+            dict | None: {'path', 'size_bytes', 'title', 'duration'} on a hit, None on a miss.
+        """
+        try:
+            hit = self._fetch(self.make_key(platform, video_id, fmt), platform, video_id, Path(dest_dir))
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Media cache read failed, downloading instead: {str(e)}")
+            hit = None
+
+        if hit is None:
+            self.count(misses=1)
+            return None
+        self.count(hits=1, bytes_served=hit['size_bytes'])
+        return hit
+
+    def _fetch(self, key: str, platform: str, video_id: str, dest_dir: Path) -> dict | None:
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT filename, size_bytes, title, duration FROM media WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            filename, size_bytes, title, duration = row
+            src = self.root / filename
+            dest_path = dest_dir / f"{platform}_{video_id}{Path(filename).suffix}"
+            # A hard link needs no room; a copy into another filesystem (e.g. /dev/shm) does
+            same_device = src.exists() and src.stat().st_dev == dest_dir.stat().st_dev
+            if not same_device and not has_room(dest_dir, size_bytes):
+                print(f"💽 No room for the cached copy in {dest_dir}, downloading instead")
+                return None
+
+            try:
+                _link_or_copy(src, dest_path)
+            except FileNotFoundError:
+                # Deleted behind our back - forget it
+                conn.execute("DELETE FROM media WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            except OSError:
+                dest_path.unlink(missing_ok=True)
+                raise
+            conn.execute("UPDATE media SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+
+        return {'path': str(dest_path), 'size_bytes': size_bytes, 'title': title, 'duration': duration}
+
+    def put(self, platform: str, video_id: str, fmt: str, src_path: str, title: str = None, duration: float = None):
+        """Store a downloaded video and evict least recently used videos over the byte bound"""
+        key = self.make_key(platform, video_id, fmt)
+        src = Path(src_path)
+        size_bytes = src.stat().st_size
+        if size_bytes > self.max_bytes:
+            return
+
+        filename = hashlib.sha256(key.encode()).hexdigest() + src.suffix
+        tmp_path = self.root / f".{filename}.{uuid.uuid4().hex}.tmp"
+        with self.connect() as conn:
+            try:
+                _link_or_copy(src, tmp_path)
+                os.replace(tmp_path, self.root / filename)
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO media (key, filename, size_bytes, title, duration, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, filename, size_bytes, title, duration, time.time()),
+                )
+                evicted = self._evict(conn)
+                conn.commit()
+            finally:
+                tmp_path.unlink(missing_ok=True)
+
+        self.count(stores=1, evictions=evicted)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM media").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        rows = conn.execute("SELECT key, filename, size_bytes FROM media ORDER BY last_access").fetchall()
+        for key, filename, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            (self.root / filename).unlink(missing_ok=True)
+            conn.execute("DELETE FROM media WHERE key = ?", (key,))
+            total -= size_bytes
+            evicted += 1
+        return evicted
+
+    def stats(self) -> dict:
+        """Hit/miss counters since process start"""
+        stats = super().stats()
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+media_cache = MediaCache(root=MEDIA_CACHE_DIR, max_bytes=MEDIA_CACHE_MAX_BYTES)
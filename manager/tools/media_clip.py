@@ -0,0 +1,216 @@
+import os
+import subprocess
+from pathlib import Path
+import imageio_ffmpeg
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Keyframe mode settings
+KEYFRAME_SAMPLE_FPS = float(os.getenv("KEYFRAME_SAMPLE_FPS", "4"))
+KEYFRAME_MAX_FRAMES = int(os.getenv("KEYFRAME_MAX_FRAMES", "12"))
+KEYFRAME_WIDTH = int(os.getenv("KEYFRAME_WIDTH", "640"))
+# Mean absolute luma difference (0-255) between samples that counts as a cut
+KEYFRAME_SCENE_THRESHOLD = float(os.getenv("KEYFRAME_SCENE_THRESHOLD", "30"))
+# Width of the grayscale frames used for scene detection
+SCENE_DETECT_WIDTH = 160
+
+
+def parse_clip_windows(spec: str) -> list[tuple[float, float]]:
+    """
+    Parse a clip window spec like "0-8,30-40" into (start, end) second pairs.
+
+    Args:
+        spec (str): Comma separated "start-end" windows in seconds.
+
+    Returns:
+        list[tuple[float, float]]: Windows sorted by start time.
+    """
+    windows = []
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        start, end = float(start), float(end)
+        if end <= start or start < 0:
+            raise ValueError(f"Invalid clip window: {part}")
+        windows.append((start, end))
+    return sorted(windows)
+
+
+def _run_ffmpeg(args: list[str]) -> bool:
+    result = subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-y', *args],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def _cut_window(src_path: str, start: float, end: float, dest_path: str) -> bool:
+    """Cut one window, stream-copying when possible and re-encoding otherwise"""
+    window = ['-ss', f"{start:.3f}", '-i', src_path, '-t', f"{end - start:.3f}"]
+
+    # Stream copy snaps to keyframes but avoids re-encoding entirely
+    if _run_ffmpeg([*window, '-c', 'copy', '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart', dest_path]):
+        return True
+
+    return _run_ffmpeg([
+        *window, '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28',
+        '-c:a', 'aac', '-movflags', '+faststart', dest_path,
+    ])
+
+
+def cut_windows(src_path: str, windows: list[tuple[float, float]], dest_path: str) -> str:
+    """
+    Cut the given windows out of a local video into a single clip with the bundled ffmpeg.
+
+    Args:
+        src_path (str): Downloaded source video.
+        windows (list[tuple[float, float]]): (start, end) seconds to keep.
+        dest_path (str): Output .mp4 path.
+
+    Returns:
+        str: dest_path
+    """
+    if len(windows) == 1:
+        if not _cut_window(src_path, *windows[0], dest_path):
+            raise ValueError(f"ffmpeg could not cut window {windows[0]}")
+        return dest_path
+
+    dest = Path(dest_path)
+    parts = []
+    try:
+        for i, (start, end) in enumerate(windows):
+            part_path = dest.with_name(f"{dest.stem}_part{i}.mp4")
+            if not _cut_window(src_path, start, end, str(part_path)):
+                raise ValueError(f"ffmpeg could not cut window {(start, end)}")
+            parts.append(part_path)
+
+        concat_list = dest.with_name(f"{dest.stem}_parts.txt")
+        concat_list.write_text(''.join(f"file '{p.as_posix()}'\n" for p in parts))
+        parts.append(concat_list)
+
+        if not _run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', str(concat_list), '-c', 'copy', dest_path]):
+            raise ValueError("ffmpeg could not join clip windows")
+    finally:
+        for part in parts:
+            part.unlink(missing_ok=True)
+
+    return dest_path
+
+
+def detect_scene_cuts(src_path: str, sample_fps: float = KEYFRAME_SAMPLE_FPS,
+                      threshold: float = KEYFRAME_SCENE_THRESHOLD,
+                      max_frames: int = KEYFRAME_MAX_FRAMES) -> list[float]:
+    """
+    Find scene cuts by differencing small grayscale frames sampled from the video.
+
+    Args:
+        src_path (str): Local video file.
+        sample_fps (float): Frames per second sampled for detection.
+        threshold (float): Mean absolute luma difference that counts as a cut.
+        max_frames (int): Maximum number of timestamps to return.
+
+    Returns:
+        list[float]: Sorted timestamps (seconds) of representative frames, always
+            including the opening frame.
+    """
+    reader = imageio_ffmpeg.read_frames(
+        src_path,
+        pix_fmt='gray',
+        bpp=1,
+        output_params=['-vf', f"fps={sample_fps},scale={SCENE_DETECT_WIDTH}:-2"],
+    )
+    next(reader)
+
+    # Score each sample against the previous one as frames arrive; only one frame is held at a time
+    previous = None
+    scores = []
+    for frame in reader:
+        current = np.frombuffer(frame, dtype=np.uint8).astype(np.int16)
+        if previous is not None:
+            scores.append(float(np.abs(current - previous).mean()))
+        previous = current
+    if previous is None:
+        return []
+
+    diffs = np.array(scores)
+    cut_indices = np.flatnonzero(diffs > threshold) + 1
+
+    # Keep the strongest cuts if there are more than we can send
+    if len(cut_indices) > max_frames - 1:
+        strongest = np.argsort(diffs[cut_indices - 1])[::-1][:max_frames - 1]
+        cut_indices = np.sort(cut_indices[strongest])
+
+    indices = [0, *cut_indices.tolist()]
+    return [index / sample_fps for index in indices]
+
+
+def extract_keyframes(src_path: str, timestamps: list[float], dest_prefix: str,
+                      width: int = KEYFRAME_WIDTH) -> list[str]:
+    """Decode the frames at the given timestamps and save them as "<dest_prefix>_<n>.jpg" files"""
+    paths = []
+    for n, timestamp in enumerate(timestamps):
+        reader = imageio_ffmpeg.read_frames(
+            src_path,
+            input_params=['-ss', f"{timestamp:.3f}"],
+            output_params=['-frames:v', '1', '-vf', f"scale='min({width},iw)':-2"],
+        )
+        meta = next(reader)
+        frame = next(reader, None)
+        reader.close()
+        if frame is None:
+            continue
+
+        path = f"{dest_prefix}_{n:02d}.jpg"
+        Image.frombytes('RGB', meta['size'], frame).save(path, format='JPEG', quality=80)
+        paths.append(path)
+    return paths
+
+
+def extract_audio(src_path: str, dest_path: str, bitrate: str = '32k') -> str | None:
+    """Downsample the audio track to mono 16 kHz AAC. Returns None if there is no audio."""
+    ok = _run_ffmpeg(['-i', src_path, '-vn', '-ac', '1', '-ar', '16000', '-c:a', 'aac', '-b:a', bitrate, dest_path])
+    if not ok or not Path(dest_path).exists() or Path(dest_path).stat().st_size == 0:
+        Path(dest_path).unlink(missing_ok=True)
+        return None
+    return dest_path
+
+
+def split_segments(src_path: str, segment_seconds: float, dest_dir: str, prefix: str) -> list[tuple[str, float, float]]:
+    """
+    Split a video into consecutive segments of about segment_seconds in one stream-copy pass.
+
+    Cuts snap to keyframes, so the actual boundaries are read back from ffmpeg's segment list.
+
+    Args:
+        src_path (str): Local video file.
+        segment_seconds (float): Target segment length.
+        dest_dir (str): Directory for the segment files.
+        prefix (str): File name prefix for the segments.
+
+    Returns:
+        list[tuple[str, float, float]]: (path, start, end) per segment, in order.
+    """
+    dest = Path(dest_dir)
+    segment_list = dest / f"{prefix}_segments.csv"
+    ok = _run_ffmpeg([
+        '-i', src_path, '-map', '0:v:0', '-map', '0:a:0?', '-c', 'copy',
+        '-f', 'segment', '-segment_time', f"{segment_seconds:g}", '-reset_timestamps', '1',
+        '-segment_list', str(segment_list), '-segment_list_type', 'csv',
+        str(dest / f"{prefix}_%03d.mp4"),
+    ])
+    try:
+        if not ok or not segment_list.exists():
+            raise ValueError("ffmpeg could not split the video into segments")
+
+        segments = []
+        for line in segment_list.read_text().splitlines():
+            name, start, end = line.rsplit(',', 2)
+            segments.append((str(dest / Path(name).name), float(start), float(end)))
+        return segments
+    finally:
+        segment_list.unlink(missing_ok=True)
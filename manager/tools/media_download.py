@@ -0,0 +1,504 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: partial downloads are only locked within this process
+    fcntl = None
+
+load_dotenv()
+
+# Adaptive read size bounds - the only media buffer held in memory is one chunk
+MIN_CHUNK_SIZE = int(os.getenv("MEDIA_MIN_CHUNK_KB", "64")) * 1024
+MAX_CHUNK_SIZE = int(os.getenv("MEDIA_MAX_CHUNK_KB", "4096")) * 1024
+# Reads faster than this grow the chunk size, reads much slower shrink it
+TARGET_READ_SECONDS = 0.1
+
+# Parallel range downloads - concurrent byte-range requests per file and their size
+RANGE_WORKERS = int(os.getenv("MEDIA_RANGE_WORKERS", "4"))
+RANGE_PART_SIZE = int(float(os.getenv("MEDIA_RANGE_PART_MB", "4")) * 1024 * 1024)
+# Connections kept alive per host
+POOL_MAXSIZE = int(os.getenv("MEDIA_POOL_MAXSIZE", "16"))
+
+# Resumable downloads - interrupted range downloads are checkpointed in this staging area when it
+# shares a filesystem with the destination; otherwise next to the destination file
+PARTIAL_DIR = Path(os.getenv(
+    "MEDIA_PARTIAL_DIR",
+    str(Path.home() / ".cache" / "automation_agent" / "partials"),
+))
+PARTIAL_MAX_BYTES = int(float(os.getenv("MEDIA_PARTIAL_MAX_MB", "2048")) * 1024 * 1024)
+PARTIAL_MAX_AGE_SECONDS = float(os.getenv("MEDIA_PARTIAL_MAX_AGE_HOURS", "24")) * 3600
+DOWNLOAD_RETRIES = int(os.getenv("MEDIA_DOWNLOAD_RETRIES", "3"))
+RETRY_BACKOFF_SECONDS = 1.0
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+)')
+
+_sessions = {}
+_host_stats = {}
+_partial_locks = {}
+_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the pooled session for the URL's host, creating it on first use"""
+    host = urlparse(url).netloc.lower()
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def _record_host(url: str, size: int, seconds: float):
+    host = urlparse(url).netloc.lower()
+    with _lock:
+        stats = _host_stats.setdefault(host, {'bytes': 0, 'seconds': 0.0, 'downloads': 0})
+        stats['bytes'] += size
+        stats['seconds'] += seconds
+        stats['downloads'] += 1
+
+
+def host_throughput() -> dict:
+    """
+    Download throughput per host since process start.
+
+    Returns:
+        dict: {host: {'bytes': int, 'seconds': float, 'downloads': int, 'mb_per_s': float}}
+    """
+    with _lock:
+        report = {host: dict(stats) for host, stats in _host_stats.items()}
+    for stats in report.values():
+        stats['mb_per_s'] = stats['bytes'] / 1024 / 1024 / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    return report
+
+
+def _check_cancelled(cancel_event: threading.Event | None):
+    if cancel_event is not None and cancel_event.is_set():
+        raise DownloadCancelled("Download cancelled")
+
+
+def _copy_stream(response: requests.Response, f, limit: int = None,
+                 cancel_event: threading.Event = None) -> tuple[int, int]:
+    """Copy a streamed body into an open file with adaptive reads. Returns (bytes, max chunk)."""
+    total = 0
+    chunk_size = MIN_CHUNK_SIZE
+    max_chunk = chunk_size
+
+    # Let urllib3 undo any transfer compression while we read raw
+    response.raw.decode_content = True
+    while limit is None or total < limit:
+        _check_cancelled(cancel_event)
+        read_size = chunk_size if limit is None else min(chunk_size, limit - total)
+        read_start = time.perf_counter()
+        chunk = response.raw.read(read_size)
+        if not chunk:
+            break
+        f.write(chunk)
+        total += len(chunk)
+
+        read_time = time.perf_counter() - read_start
+        if len(chunk) == chunk_size and read_time < TARGET_READ_SECONDS:
+            chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+        elif read_time > TARGET_READ_SECONDS * 4:
+            chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+        max_chunk = max(max_chunk, chunk_size)
+
+    return total, max_chunk
+
+
+def _result(url: str, total: int, start: float, max_chunk: int, parts: int, resumed: int = 0) -> dict:
+    elapsed = time.perf_counter() - start
+    downloaded = total - resumed
+    _record_host(url, downloaded, elapsed)
+    return {
+        'bytes': total,
+        'seconds': elapsed,
+        'mb_per_s': downloaded / 1024 / 1024 / elapsed if elapsed > 0 else 0.0,
+        'max_chunk': max_chunk,
+        'parts': parts,
+        'resumed_bytes': resumed,
+    }
+
+
+class PartialInvalidated(Exception):
+    """The server no longer serves the content a checkpoint was taken from"""
+
+
+class DownloadCancelled(TimeoutError):
+    """The caller set cancel_event; the partial is kept for a later resume"""
+
+
+def partial_dir_for(dest_path: str) -> Path:
+    """
+    Where to stage a download of dest_path.
+
+    PARTIAL_DIR is used when it is on the destination's filesystem, so a
+    partial survives the run and finishing is a rename. Otherwise (e.g.
+    staging in /dev/shm) the partial sits next to the destination, so the
+    download is never copied across filesystems.
+    """
+    dest_dir = Path(dest_path).parent
+    try:
+        PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+        if PARTIAL_DIR.stat().st_dev == dest_dir.stat().st_dev:
+            return PARTIAL_DIR
+    except OSError:
+        pass
+    return dest_dir
+
+
+class PartialDownload:
+    """
+    A download in the staging area: the data file plus a JSON checkpoint of
+    the byte ranges already written to it, so a retry (or the next run) only
+    fetches what is missing.
+    """
+
+    def __init__(self, key: str, directory: Path = PARTIAL_DIR):
+        name = hashlib.sha256(key.encode()).hexdigest()[:32]
+        self.directory = Path(directory)
+        self.data_path = self.directory / f"{name}.part"
+        self.checkpoint_path = self.directory / f"{name}.json"
+        self.lock_path = self.directory / f"{name}.lock"
+        self.total_size = None
+        self.done = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Hold the partial for one download at a time.
+
+        Concurrent downloads of the same content would otherwise truncate or
+        move the shared file under each other. A per-path lock covers threads
+        in this process; an flock on the .lock file covers other processes.
+        """
+        with _lock:
+            path_lock = _partial_locks.setdefault(self.data_path, threading.Lock())
+        with path_lock:
+            if fcntl is None:
+                yield
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        """Restore the checkpoint left by an earlier attempt, if it is still consistent"""
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+            if self.data_path.stat().st_size != checkpoint['total_size']:
+                raise ValueError("partial size does not match checkpoint")
+            self.total_size = checkpoint['total_size']
+            self.done = [tuple(r) for r in checkpoint['done']]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Discarding unreadable partial download: {str(e)}")
+            self.reset()
+
+    def start(self, total_size: int):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.data_path, 'wb') as f:
+            f.truncate(total_size)
+        self.total_size = total_size
+        self.done = []
+        self._save()
+
+    def reset(self):
+        self.data_path.unlink(missing_ok=True)
+        self.checkpoint_path.unlink(missing_ok=True)
+        self.total_size = None
+        self.done = []
+
+    def add(self, first: int, last: int):
+        """Mark bytes first..last (inclusive) as written and persist the checkpoint"""
+        with self._lock:
+            merged = []
+            for a, b in sorted([*self.done, (first, last)]):
+                if merged and a <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+                else:
+                    merged.append((a, b))
+            self.done = merged
+            self._save()
+
+    def _save(self):
+        # Write-then-rename so a crash never leaves a torn checkpoint
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({'total_size': self.total_size, 'done': self.done}))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def bytes_done(self) -> int:
+        return sum(b - a + 1 for a, b in self.done)
+
+    def missing(self, part_size: int) -> list[tuple[int, int]]:
+        """Byte ranges not yet written, split into part_size pieces"""
+        gaps, offset = [], 0
+        for a, b in self.done:
+            if a > offset:
+                gaps.append((offset, a - 1))
+            offset = b + 1
+        if offset < self.total_size:
+            gaps.append((offset, self.total_size - 1))
+
+        return [
+            (first, min(first + part_size - 1, gap_last))
+            for gap_first, gap_last in gaps
+            for first in range(gap_first, gap_last + 1, part_size)
+        ]
+
+    def finish(self, dest_path: str):
+        """Rename the completed file to its destination and drop the checkpoint"""
+        os.replace(self.data_path, dest_path)
+        self.checkpoint_path.unlink(missing_ok=True)
+
+
+def _in_use(lock_path: Path) -> bool:
+    """True if another process is downloading into the partial guarded by lock_path"""
+    if fcntl is None or not lock_path.exists():
+        return False
+    with open(lock_path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return False
+
+
+def cleanup_partials(max_bytes: int = PARTIAL_MAX_BYTES, max_age_seconds: float = PARTIAL_MAX_AGE_SECONDS) -> int:
+    """
+    Delete stale partial downloads: anything older than max_age_seconds, then the
+    least recently touched ones until the staging area fits in max_bytes.
+
+    Returns:
+        int: Number of partial downloads removed.
+    """
+    if not PARTIAL_DIR.exists():
+        return 0
+
+    now = time.time()
+    partials = []
+    for data_path in PARTIAL_DIR.glob('*.part'):
+        try:
+            stat = data_path.stat()
+        except FileNotFoundError:
+            continue
+        partials.append((stat.st_mtime, stat.st_size, data_path))
+    partials.sort()
+
+    total = sum(size for _, size, _ in partials)
+    removed = 0
+    for mtime, size, data_path in partials:
+        if now - mtime <= max_age_seconds and total <= max_bytes:
+            break
+        if _in_use(data_path.with_suffix('.lock')):
+            continue
+        data_path.unlink(missing_ok=True)
+        data_path.with_suffix('.json').unlink(missing_ok=True)
+        total -= size
+        removed += 1
+
+    # Checkpoints and idle locks whose data file is already gone
+    for checkpoint_path in PARTIAL_DIR.glob('*.json'):
+        if not checkpoint_path.with_suffix('.part').exists():
+            checkpoint_path.unlink(missing_ok=True)
+    for lock_path in PARTIAL_DIR.glob('*.lock'):
+        if not lock_path.with_suffix('.part').exists() and not _in_use(lock_path):
+            lock_path.unlink(missing_ok=True)
+    return removed
+
+
+def _write_range(response: requests.Response, partial: PartialDownload, first: int, last: int,
+                 cancel_event: threading.Event = None) -> int:
+    """Copy a range response into the partial file, checkpointing whatever arrived even on failure"""
+    written = 0
+    try:
+        with open(partial.data_path, 'r+b') as f:
+            f.seek(first)
+            try:
+                _copy_stream(response, f, limit=last - first + 1, cancel_event=cancel_event)
+            finally:
+                written = f.tell() - first
+    finally:
+        if written > 0:
+            partial.add(first, first + written - 1)
+    return written
+
+
+def _fetch_range(url: str, partial: PartialDownload, first: int, last: int,
+                 headers: dict, cookies, timeout: float, cancel_event: threading.Event = None) -> int:
+    """Download bytes first..last (inclusive) into the same offsets of the partial file"""
+    # Queued ranges of a cancelled download are skipped rather than requested
+    _check_cancelled(cancel_event)
+    range_headers = {**(headers or {}), 'Range': f"bytes={first}-{last}", 'Accept-Encoding': 'identity'}
+    with get_session(url).get(url, headers=range_headers, cookies=cookies, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        match = CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+        if response.status_code != 206 or not match:
+            raise PartialInvalidated(f"Server ignored range {first}-{last}")
+        if int(match.group(3)) != partial.total_size:
+            raise PartialInvalidated(f"Size changed from {partial.total_size} to {match.group(3)} bytes")
+        size = _write_range(response, partial, first, last, cancel_event)
+
+    if size != last - first + 1:
+        raise ValueError(f"Range {first}-{last} returned {size} bytes")
+    return size
+
+
+def _write_whole(response: requests.Response, partial: PartialDownload, cancel_event: threading.Event = None) -> int:
+    """Write a complete (non-range) response to the partial's data file. Returns the max chunk."""
+    partial.directory.mkdir(parents=True, exist_ok=True)
+    with open(partial.data_path, 'wb') as f:
+        _, max_chunk = _copy_stream(response, f, cancel_event=cancel_event)
+    return max_chunk
+
+
+def _download_attempt(url: str, partial: PartialDownload, headers: dict, cookies, timeout: float,
+                      workers: int, part_size: int, cancel_event: threading.Event = None) -> tuple[int, int]:
+    """One pass over whatever is still missing. Returns (max chunk, requests made)."""
+    max_chunk = MIN_CHUNK_SIZE
+    requests_made = 0
+
+    if partial.total_size is None:
+        probe_headers = {**(headers or {}), 'Range': f"bytes=0-{part_size - 1}", 'Accept-Encoding': 'identity'}
+        with get_session(url).get(url, headers=probe_headers, cookies=cookies, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            match = CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+
+            if response.status_code != 206:
+                # No range support: the probe response is the whole file and cannot be resumed
+                return _write_whole(response, partial, cancel_event), 1
+
+            if match:
+                partial.start(int(match.group(3)))
+                _write_range(response, partial, 0, int(match.group(2)), cancel_event)
+                requests_made += 1
+
+        if partial.total_size is None:
+            # A range answer without a total size (e.g. "bytes 0-4194303/*") holds only the
+            # first part and the rest cannot be planned, so fetch the whole file in one request
+            with get_session(url).get(url, headers=headers, cookies=cookies, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                return _write_whole(response, partial, cancel_event), 2
+
+    ranges = partial.missing(part_size)
+    if ranges:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(ranges)))) as pool:
+            list(pool.map(
+                lambda r: _fetch_range(url, partial, r[0], r[1], headers, cookies, timeout, cancel_event), ranges
+            ))
+        requests_made += len(ranges)
+
+    if partial.bytes_done() != partial.total_size:
+        raise ValueError(f"Downloaded {partial.bytes_done()} of {partial.total_size} bytes")
+    return max_chunk, requests_made
+
+
+def download_file(url: str, dest_path: str, headers: dict = None, cookies=None, timeout: float = 30,
+                  workers: int = RANGE_WORKERS, part_size: int = RANGE_PART_SIZE,
+                  resume_key: str = None, retries: int = DOWNLOAD_RETRIES,
+                  cancel_event: threading.Event = None) -> dict:
+    """
+    Download a media URL to disk with concurrent, resumable byte-range requests.
+
+    The first part doubles as a probe: if the server answers it with 206 and a
+    total size, the rest of the file is split into part_size ranges fetched in
+    parallel over the host's pooled connections, each written at its own offset
+    so the file is assembled in order. Servers without range support get a
+    single-stream download of the probe response instead.
+
+    Range downloads are staged with a checkpoint of the ranges written so far,
+    in PARTIAL_DIR or next to dest_path (see partial_dir_for), and renamed into
+    place when complete. A failed attempt is retried with Range requests for
+    the missing bytes only, and a partial left behind by an earlier run with
+    the same resume_key is picked up where it stopped. Downloads sharing a
+    resume_key take turns on the partial.
+
+    Args:
+        url (str): Direct media URL (e.g. yt-dlp's info['url']).
+        dest_path (str): File to write the media to.
+        headers (dict): Request headers, e.g. yt-dlp's info['http_headers'].
+        cookies: Cookie jar to send with the requests.
+        timeout (float): Connect/read timeout in seconds.
+        workers (int): Concurrent range requests.
+        part_size (int): Bytes per range request.
+        resume_key (str): Stable identity of the content, e.g. "youtube:<id>:<format_id>".
+            Signed media URLs change between runs, so it defaults to the URL only as a fallback.
+        retries (int): Attempts after the first one before giving up.
+        cancel_event (threading.Event): Once set, stop between reads and ranges and raise
+            DownloadCancelled without retrying.
+
+    Returns:
+        dict: {'bytes': int, 'seconds': float, 'mb_per_s': float, 'max_chunk': int, 'parts': int,
+            'resumed_bytes': int}
+    """
+    start = time.perf_counter()
+    partial = PartialDownload(resume_key or url, partial_dir_for(dest_path))
+    with partial.exclusive():
+        return _download_locked(url, dest_path, partial, headers, cookies, timeout, workers, part_size,
+                                retries, start, cancel_event)
+
+
+def _download_locked(url: str, dest_path: str, partial: PartialDownload, headers: dict, cookies,
+                     timeout: float, workers: int, part_size: int, retries: int, start: float,
+                     cancel_event: threading.Event = None) -> dict:
+    """download_file body, run while holding the partial"""
+    partial.load()
+    resumed = partial.bytes_done()
+    if resumed:
+        print(f"↩️ Resuming download at {resumed / 1024 / 1024:.2f} of "
+              f"{partial.total_size / 1024 / 1024:.2f} MB")
+
+    parts = 0
+    for attempt in range(retries + 1):
+        try:
+            max_chunk, requests_made = _download_attempt(
+                url, partial, headers, cookies, timeout, workers, part_size, cancel_event
+            )
+            parts += requests_made
+            break
+        except PartialInvalidated as e:
+            print(f"⚠️ Partial download is no longer valid ({str(e)}), restarting")
+            partial.reset()
+            resumed = 0
+            if attempt == retries:
+                raise
+        except DownloadCancelled:
+            # Keep the partial; a later run can resume it
+            raise
+        except (requests.RequestException, Urllib3Error, OSError, ValueError) as e:
+            if attempt == retries:
+                # Keep the partial on disk so the next run can resume it
+                raise
+            print(f"⚠️ Download interrupted ({str(e)}), retrying from "
+                  f"{partial.bytes_done() / 1024 / 1024:.2f} MB (attempt {attempt + 2}/{retries + 1})")
+            if cancel_event is None:
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+            elif cancel_event.wait(RETRY_BACKOFF_SECONDS * 2 ** attempt):
+                raise DownloadCancelled("Download cancelled")
+
+    total = partial.data_path.stat().st_size
+    partial.finish(dest_path)
+    return _result(url, total, start, max_chunk, parts=parts, resumed=resumed)
@@ -0,0 +1,100 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Analysis floor: the smallest stream whose short side is inside this band is good enough for Gemini
+ANALYSIS_MIN_HEIGHT = int(os.getenv("ANALYSIS_MIN_HEIGHT", "360"))
+ANALYSIS_MAX_HEIGHT = int(os.getenv("ANALYSIS_MAX_HEIGHT", "480"))
+ANALYSIS_REQUIRE_AUDIO = os.getenv("ANALYSIS_REQUIRE_AUDIO", "true").lower() == "true"
+# Identifies what select_analysis_format picks, e.g. for caching downloads by format
+ANALYSIS_FORMAT_POLICY = f"{ANALYSIS_MIN_HEIGHT}-{ANALYSIS_MAX_HEIGHT}p{'+audio' if ANALYSIS_REQUIRE_AUDIO else ''}"
+
+# Protocols media_download.download_file can fetch over plain HTTP(S)
+DIRECT_PROTOCOLS = ('http', 'https')
+
+
+def has_video(fmt: dict) -> bool:
+    return fmt.get('vcodec') not in (None, 'none') or bool(fmt.get('height'))
+
+
+def has_audio(fmt: dict) -> bool:
+    # yt-dlp leaves acodec unset for some progressive TikTok formats
+    return fmt.get('acodec') != 'none'
+
+
+def short_side(fmt: dict) -> int:
+    """Resolution class of a format: the short side, so a 360x640 vertical Short counts as 360p"""
+    height = fmt.get('height') or 0
+    width = fmt.get('width')
+    return min(width, height) if width and height else height
+
+
+def format_size(fmt: dict, duration: float = None) -> int | None:
+    """Exact or approximate size of a format in bytes, estimated from bitrate if needed"""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    if fmt.get('tbr') and duration:
+        return int(fmt['tbr'] * 1000 / 8 * duration)
+    return None
+
+
+def _size_key(fmt: dict, duration: float = None) -> tuple:
+    size = format_size(fmt, duration)
+    # Unknown sizes sort after known ones, then by resolution and bitrate
+    return (size is None, size or 0, short_side(fmt), fmt.get('tbr') or 0)
+
+
+def select_analysis_format(
+    formats: list[dict],
+    duration: float = None,
+    min_height: int = ANALYSIS_MIN_HEIGHT,
+    max_height: int = ANALYSIS_MAX_HEIGHT,
+    require_audio: bool = ANALYSIS_REQUIRE_AUDIO,
+) -> tuple[dict | None, dict | None]:
+    """
+    Pick the smallest directly downloadable stream that meets the analysis floor.
+
+    Preference order:
+        1. Smallest stream with min_height <= short side <= max_height
+        2. Smallest stream above max_height
+        3. Largest stream below min_height
+
+    Resolution is compared on the short side (min of width and height), as
+    most Shorts and TikToks are vertical.
+
+    Args:
+        formats (list[dict]): yt-dlp info['formats'].
+        duration (float): Video duration in seconds, used to estimate sizes.
+        min_height (int): Lower bound of the analysis band (short side).
+        max_height (int): Upper bound of the analysis band (short side).
+        require_audio (bool): Only consider formats that carry an audio track.
+
+    Returns:
+        tuple[dict | None, dict | None]: (chosen format, largest candidate format) or
+            (None, None) when no single-file stream qualifies.
+    """
+    candidates = [
+        f for f in formats or []
+        if f.get('url')
+        and f.get('protocol', 'https') in DIRECT_PROTOCOLS
+        and has_video(f)
+        and (has_audio(f) or not require_audio)
+    ]
+    if not candidates:
+        return None, None
+
+    best = max(candidates, key=lambda f: (format_size(f, duration) or 0, f.get('height') or 0, f.get('tbr') or 0))
+
+    in_band = [f for f in candidates if min_height <= short_side(f) <= max_height]
+    above = [f for f in candidates if short_side(f) > max_height]
+
+    if in_band:
+        chosen = min(in_band, key=lambda f: _size_key(f, duration))
+    elif above:
+        chosen = min(above, key=lambda f: _size_key(f, duration))
+    else:
+        chosen = max(candidates, key=lambda f: (short_side(f), f.get('tbr') or 0))
+
+    return chosen, best
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where videos are staged between download and upload: auto | shm | disk
+# auto uses /dev/shm when it has room; disk opts out, e.g. on a node with a fast,
+# idle disk whose page cache already keeps staged files in memory
+MEDIA_STAGING_BACKEND = os.getenv("MEDIA_STAGING_BACKEND", "auto").lower()
+MEDIA_SHM_DIR = Path(os.getenv("MEDIA_SHM_DIR", "/dev/shm"))
+# Keep at least this much of the tmpfs free; containers often mount a 64 MB /dev/shm
+MEDIA_STAGING_MIN_FREE_BYTES = int(float(os.getenv("MEDIA_STAGING_MIN_FREE_MB", "512")) * 1024 * 1024)
+
+
+def free_bytes(path: Path) -> int:
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return 0
+
+
+def shm_available(min_free: int = MEDIA_STAGING_MIN_FREE_BYTES) -> bool:
+    """True if the memory-backed tmpfs exists, is writable and has room to spare"""
+    return (
+        MEDIA_SHM_DIR.is_dir()
+        and os.access(MEDIA_SHM_DIR, os.W_OK)
+        and free_bytes(MEDIA_SHM_DIR) >= min_free
+    )
+
+
+def make_staging_dir(prefix: str) -> tuple[Path, str]:
+    """
+    Create a staging directory, in memory-backed /dev/shm when possible.
+
+    Args:
+        prefix (str): Directory name prefix.
+
+    Returns:
+        tuple[Path, str]: (directory, backend) where backend is 'shm' or 'disk'.
+    """
+    if MEDIA_STAGING_BACKEND in ('auto', 'shm'):
+        if shm_available():
+            try:
+                return Path(tempfile.mkdtemp(prefix=prefix, dir=MEDIA_SHM_DIR)), 'shm'
+            except OSError as e:
+                print(f"⚠️ Could not create staging dir in {MEDIA_SHM_DIR}: {str(e)}")
+        elif MEDIA_STAGING_BACKEND == 'shm':
+            print(f"⚠️ {MEDIA_SHM_DIR} is missing, read-only or full, staging on disk")
+
+    return Path(tempfile.mkdtemp(prefix=prefix)), 'disk'
+
+
+def has_room(directory: Path, size: int, min_free: int = MEDIA_STAGING_MIN_FREE_BYTES) -> bool:
+    """True if a file of size bytes fits in directory while leaving min_free bytes"""
+    return free_bytes(directory) - size >= min_free
@@ -0,0 +1,125 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PipelineTimeout(TimeoutError):
+    """Result for an item that was still in flight when run_pipeline stopped waiting"""
+
+
+def run_pipeline(items: list, stages: list[tuple], deadline_seconds: float = None, min_success: int = 0,
+                 is_success=None, on_discard=None, cancel_event: threading.Event = None) -> list:
+    """
+    Run items through a chain of stages with a bounded worker pool per stage.
+
+    Each stage has its own pool, so item N+1 can be in the first stage while
+    item N is still in a later one (e.g. downloading while Gemini processes).
+
+    With a deadline or a minimum success count the pipeline returns early: as
+    soon as min_success items have succeeded or deadline_seconds have passed,
+    queued work is cancelled, no straggler is moved on to its next stage, and
+    every unfinished item gets a PipelineTimeout result.
+
+    Args:
+        items (list): Inputs for the first stage.
+        stages (list[tuple]): (name, fn, workers) tuples. fn receives the previous
+            stage's output and returns the next stage's input.
+        deadline_seconds (float): Stop waiting after this many seconds.
+        min_success (int): Stop waiting once this many items have succeeded.
+        is_success: Optional predicate on a final result; by default any result
+            that is not an exception counts as a success.
+        on_discard: Called with whatever a straggler produces after the cut-off,
+            so the caller can release resources held by it.
+        cancel_event (threading.Event): Set at the cut-off; long-running stage
+            functions can poll it to give up early.
+
+    Returns:
+        list: Final stage output for every item, in input order. If a stage raises,
+            the exception object is the result for that item and later stages are skipped.
+    """
+    if not items:
+        return []
+
+    results = [None] * len(items)
+    done = [False] * len(items)
+    counts = {'remaining': len(items), 'successes': 0}
+    lock = threading.Lock()
+    finished = threading.Event()
+    cancelled = cancel_event or threading.Event()
+
+    pools = [
+        ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix=f"pipeline_{name}")
+        for name, _, workers in stages
+    ]
+
+    def discard(value):
+        if on_discard is not None:
+            try:
+                on_discard(value)
+            except Exception as e:
+                print(f"⚠️ Failed to release straggler result: {str(e)}")
+
+    def finish(index: int, value):
+        with lock:
+            if cancelled.is_set():
+                late = True
+            else:
+                late = False
+                results[index] = value
+                done[index] = True
+                counts['remaining'] -= 1
+                if not isinstance(value, Exception) and (is_success is None or is_success(value)):
+                    counts['successes'] += 1
+                if counts['remaining'] == 0 or (min_success and counts['successes'] >= min_success):
+                    finished.set()
+        if late:
+            discard(value)
+
+    def submit(index: int, stage_index: int, value):
+        if stage_index == len(stages):
+            finish(index, value)
+            return
+        if cancelled.is_set():
+            discard(value)
+            return
+
+        fn = stages[stage_index][1]
+        try:
+            future = pools[stage_index].submit(fn, value)
+        except RuntimeError:
+            # Pool shut down at the cut-off
+            discard(value)
+            return
+        future.add_done_callback(lambda f: advance(index, stage_index, f))
+
+    def advance(index: int, stage_index: int, future):
+        try:
+            value = future.result()
+        except Exception as e:
+            finish(index, e)
+            return
+        submit(index, stage_index + 1, value)
+
+    cut_off = False
+    try:
+        for index, item in enumerate(items):
+            submit(index, 0, item)
+        finished.wait(timeout=deadline_seconds)
+    finally:
+        with lock:
+            cut_off = counts['remaining'] > 0
+            if cut_off:
+                cancelled.set()
+                reason = (
+                    f"{counts['successes']} of {min_success} required results were ready"
+                    if min_success and counts['successes'] >= min_success
+                    else f"deadline of {deadline_seconds:g}s passed" if deadline_seconds is not None
+                    else "pipeline was interrupted"
+                )
+                for index in range(len(items)):
+                    if not done[index]:
+                        results[index] = PipelineTimeout(f"Timed out: {reason}")
+        # Stragglers keep their thread until their current stage returns; don't wait for them
+        for pool in pools:
+            pool.shutdown(wait=not cut_off, cancel_futures=cut_off)
+
+    return results
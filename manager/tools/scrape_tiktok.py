@@ -1,22 +1,14 @@
-from apify_client import ApifyClient
-import os
+from manager.tools.actor_media import actor_media, stored_media_url, ACTOR_MEDIA_ENABLED
+from manager.tools.apify_async import run_actor, run_sync
 
-# Initialize the ApifyClient with your API token
-API_TOKEN = os.getenv("APIFY_API_TOKEN")
-client = ApifyClient(API_TOKEN)
+ACTOR_ID = "GdWCkxBtKWOsKjdch"
+# Only these item fields are downloaded from the dataset
+RESULT_FIELDS = ["text", "webVideoUrl", "playCount", "mediaUrls", "videoMeta"]
+CACHE_TTL_SECONDS = 15 * 60
 
 
-def scrape_tiktok(category: str, region: str, results_per_page: int = 3) -> list[dict]:
-    """
-    Scrape TikTok videos by category and region.
-
-    Returns:
-        list[dict]: A list of dictionaries, each containing:
-            - description (str)
-            - views (int)
-            - link (str)
-    """
-    run_input = {
+def build_run_input(category: str, results_per_page: int) -> dict:
+    return {
         "excludePinnedPosts": False,
         "proxyCountryCode": "US",
         "resultsPerPage": results_per_page,
@@ -34,21 +26,61 @@ def scrape_tiktok(category: str, region: str, results_per_page: int = 3) -> list
         "maxProfilesPerQuery": 10
     }
 
+
+async def scrape_tiktok_async(category: str, region: str, results_per_page: int = 3) -> list[dict]:
+    """
+    Scrape TikTok videos by category and region without blocking the event loop.
+
+    Returns:
+        list[dict]: A list of dictionaries, each containing:
+            - title (str)
+            - url (str)
+            - viewCount (int)
+            - mediaUrl (str | None): the MP4 the actor stored, which summ_down downloads
+              instead of the TikTok page
+    """
     # Run the Actor
-    run = client.actor("GdWCkxBtKWOsKjdch").call(run_input=run_input)
+    items = await run_actor(
+        ACTOR_ID, build_run_input(category, results_per_page), fields=RESULT_FIELDS, limit=results_per_page,
+        cache_ttl_seconds=CACHE_TTL_SECONDS,
+    )
 
     # Collect results
     results = []
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
+    for item in items:
+        media_url = stored_media_url(item)
         results.append({
             "title": item.get("text", ""),
             "url": item.get("webVideoUrl", ""),
-            "viewCount": item.get("playCount", 0)
+            "viewCount": item.get("playCount", 0),
+            "mediaUrl": media_url
         })
+        if ACTOR_MEDIA_ENABLED and media_url:
+            try:
+                actor_media.register(
+                    item.get("webVideoUrl", ""), media_url,
+                    title=item.get("text"), duration=(item.get("videoMeta") or {}).get("duration"),
+                )
+            except Exception as e:
+                print(f"⚠️ Could not record stored TikTok video: {str(e)}")
 
     return results
 
 
+def scrape_tiktok(category: str, region: str, results_per_page: int = 3) -> list[dict]:
+    """
+    Scrape TikTok videos by category and region.
+
+    Returns:
+        list[dict]: A list of dictionaries, each containing:
+            - title (str)
+            - url (str)
+            - viewCount (int)
+            - mediaUrl (str | None)
+    """
+    return run_sync(scrape_tiktok_async(category, region, results_per_page))
+
+
 # # Example usage
 # if __name__ == "__main__":
 #     data = scrape_tiktok("gaming", "US", 5)
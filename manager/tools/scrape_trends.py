@@ -0,0 +1,39 @@
+from manager.tools.apify_async import gather_actors
+from manager.tools.google_scrapper import google_scrapper_async
+from manager.tools.scrape_tiktok import scrape_tiktok_async
+from manager.tools.yt_scrapper import yt_scrapper_async
+
+
+async def scrape_trends(
+    category: str,
+    region: str,
+    sorting: str = "NEWEST",
+    short_c: int = 2,
+    results_per_page: int = 3,
+    timeframe: str = "",
+) -> dict:
+    """
+    Fetch YouTube Shorts and TikTok videos for a category in one call, running the actors concurrently.
+
+    Args:
+        category (str): Search term / niche for both platforms.
+        region (str): Region for TikTok (and Google Trends when timeframe is set).
+        sorting (str): YouTube sort order, e.g. "NEWEST" or "POPULAR".
+        short_c (int): Number of YouTube Shorts to fetch.
+        results_per_page (int): Number of TikTok videos to fetch.
+        timeframe (str): Also fetch Google trending searches for this timeframe (e.g. '24', '7d');
+            empty to skip.
+
+    Returns:
+        dict: {'youtube': [...], 'tiktok': [...]} with items {title, url, viewCount}, plus
+            'google': [{term, volume}, ...] when timeframe is set. A platform whose actor failed
+            maps to an empty list.
+    """
+    calls = {
+        'youtube': yt_scrapper_async(category, sorting, short_c),
+        'tiktok': scrape_tiktok_async(category, region, results_per_page),
+    }
+    if timeframe:
+        calls['google'] = google_scrapper_async(region, timeframe)
+
+    return await gather_actors(calls)
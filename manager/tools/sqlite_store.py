@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class SQLiteStore:
+    """
+    Base for the persistent caches and registries kept in a local SQLite file.
+
+    Subclasses list their CREATE statements in SCHEMA. Callers run on many
+    threads, so every operation opens its own short-lived connection; the
+    database and schema are created by the first one. In-process counters
+    live in _stats and are updated through count().
+    """
+
+    SCHEMA: tuple[str, ...] = ()
+
+    def __init__(self, path: str | Path, stats: dict):
+        self.path = Path(path)
+
+        self._lock = threading.Lock()
+        self._stats = dict(stats)
+        self._initialized = False
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+
+    @contextmanager
+    def connect(self):
+        """Open a connection to the store, creating it on first use, and close it afterwards"""
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._initialized:
+                self._init_schema(conn)
+                conn.commit()
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def count(self, **increments):
+        """Add to the in-process counters, e.g. count(hits=1, bytes_saved=size)"""
+        with self._lock:
+            for name, amount in increments.items():
+                self._stats[name] += amount
+
+    def stats(self) -> dict:
+        """Counters since process start"""
+        with self._lock:
+            return dict(self._stats)
+
+
+def evict_lru(conn: sqlite3.Connection, table: str, max_entries: int) -> int:
+    """Delete all but the max_entries most recently accessed rows (by last_access) of table"""
+    evicted = conn.execute(
+        f"DELETE FROM {table} WHERE key IN ("
+        f"SELECT key FROM {table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+        (max_entries,),
+    ).rowcount
+    return max(evicted, 0)
@@ -380,23 +380,166 @@ import tempfile
 import shutil
 import time
 import json
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
+import requests
 import yt_dlp
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from pydantic import ValidationError
 from dotenv import load_dotenv
 
+from manager.tools.actor_media import actor_media, auth_headers, expected_size, ACTOR_MEDIA_ENABLED
+from manager.tools.analysis_schema import BatchVideoAnalysis, TriageResult, VideoAnalysis
+from manager.tools.gemini_files import gemini_files, wait_for_processing, GEMINI_FILE_REGISTRY_ENABLED
+from manager.tools.media_budget import media_budget, MEDIA_BUDGET_WAIT_SECONDS
+from manager.tools.media_clip import (
+    cut_windows, detect_scene_cuts, extract_audio, extract_keyframes, parse_clip_windows, split_segments
+)
+from manager.tools.media_download import DownloadCancelled, cleanup_partials, download_file, host_throughput
+from manager.tools.media_cache import media_cache, MEDIA_CACHE_ENABLED
+from manager.tools.media_staging import has_room, make_staging_dir
+from manager.tools.media_formats import (
+    ANALYSIS_FORMAT_POLICY, DIRECT_PROTOCOLS, format_size, select_analysis_format, short_side
+)
+from manager.tools.pipeline import PipelineTimeout, run_pipeline
+from manager.tools.summary_cache import summary_cache, SUMMARY_CACHE_ENABLED
+from manager.tools.video_urls import (
+    canonical_video_url, parse_video_url, resolve_video_url, video_cache_key, video_platform
+)
+
 # Configuration - Set your API key here
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # Replace with your actual API key
 
-
-def summ_down(video_urls: list[str]) -> list[dict]:
+# Pipeline concurrency - number of workers per stage
+DOWNLOAD_WORKERS = int(os.getenv("SUMM_DOWN_DOWNLOAD_WORKERS", "2"))
+UPLOAD_WORKERS = int(os.getenv("SUMM_DOWN_UPLOAD_WORKERS", "3"))
+ANALYSIS_WORKERS = int(os.getenv("SUMM_DOWN_ANALYSIS_WORKERS", "2"))
+
+# Clips up to this size go inline in generate_content instead of via the File API
+INLINE_VIDEO_MAX_BYTES = int(float(os.getenv("SUMM_DOWN_INLINE_MAX_MB", "15")) * 1024 * 1024)
+
+# Platforms whose URLs Gemini can read directly, so nothing is downloaded for them
+DIRECT_URL_PLATFORMS = {
+    p.strip() for p in os.getenv("SUMM_DOWN_DIRECT_URL_PLATFORMS", "youtube").split(",") if p.strip()
+}
+# Errors meaning Gemini cannot read a URL reference (private, age-gated, removed), as
+# opposed to quota, server or timeout errors, which a download would not fix
+URL_REJECTED_ERRORS = (
+    google_exceptions.InvalidArgument, google_exceptions.PermissionDenied, google_exceptions.NotFound
+)
+
+# Bump when the prompt or output format changes so stale analyses are not reused
+ANALYSIS_CACHE_VARIANT = "viral_analysis:v2"
+
+# Structured output: Gemini is constrained to these schemas, so the prompts no longer spell them out
+ANALYSIS_GENERATION_CONFIG = {'response_mime_type': 'application/json', 'response_schema': VideoAnalysis}
+BATCH_GENERATION_CONFIG = {'response_mime_type': 'application/json', 'response_schema': list[BatchVideoAnalysis]}
+TRIAGE_GENERATION_CONFIG = {'response_mime_type': 'application/json', 'response_schema': TriageResult}
+
+ANALYSIS_PROMPT = """
+You are a Video Analysis & Viral Pattern Extraction Agent.
+
+INSTRUCTIONS:
+- Analyze the uploaded video directly (not summaries, not transcripts).
+- Identify viral ingredients, storytelling DNA, emotional triggers, pacing, editing style, and hooks.
+- Capture the genre, theme, target emotions, POV, setting, characters, conflict, stakes, and payoff.
+- All array fields must contain at least one value.
+- If a field cannot be determined, fill it with "unknown" (never leave fields empty).
+"""
+
+# Batch mode - several videos per generate_content call, bounded by a token and inline-size budget
+BATCH_MAX_TOKENS = int(os.getenv("SUMM_DOWN_BATCH_MAX_TOKENS", "500000"))
+BATCH_MAX_INLINE_BYTES = int(float(os.getenv("SUMM_DOWN_BATCH_MAX_INLINE_MB", "18")) * 1024 * 1024)
+# Gemini bills roughly 258 tokens per sampled frame (1 fps) plus 32 per second of audio
+VIDEO_TOKENS_PER_SECOND = 290
+IMAGE_TOKENS = 258
+AUDIO_TOKENS_PER_SECOND = 32
+# Assumed length when the duration is unknown (e.g. URL references)
+DEFAULT_VIDEO_SECONDS = 60
+
+BATCH_PROMPT = """
+You are a Video Analysis & Viral Pattern Extraction Agent.
+
+You are given {count} videos. Each one is preceded by a label "VIDEO <n> (<url>)".
+
+INSTRUCTIONS:
+- Analyze every video directly and independently (not summaries, not transcripts).
+- Identify viral ingredients, storytelling DNA, emotional triggers, pacing, editing style, and hooks.
+- Capture the genre, theme, target emotions, POV, setting, characters, conflict, stakes, and payoff.
+- Return one entry per video, with "video" set to its label number <n>.
+- All array fields must contain at least one value.
+- If a field cannot be determined, fill it with "unknown" (never leave fields empty).
+"""
+
+# Segmented (map-reduce) mode - long videos are split locally and the segments analyzed in parallel
+SEGMENT_WORKERS = int(os.getenv("SUMM_DOWN_SEGMENT_WORKERS", "4"))
+# Only videos longer than this many segments are split; shorter ones are analyzed whole
+SEGMENT_MIN_RATIO = 1.5
+
+SEGMENT_REDUCE_PROMPT = """
+You are a Video Analysis & Viral Pattern Extraction Agent.
+
+A long video was split into consecutive segments and each segment was analyzed on its own.
+Below are the per-segment analyses in order, with their time ranges.
+
+INSTRUCTIONS:
+- Merge them into ONE analysis of the whole video.
+- Hooks and the hook pattern come mainly from the opening segment.
+- The summary must cover the whole video in order; the payoff comes from the final segment.
+- Drop duplicates, keep the strongest viral ingredients.
+- If a field cannot be determined, fill it with "unknown" (never leave fields empty).
+
+SEGMENT ANALYSES:
+"""
+
+# Triage tier - cheap text-only pass that ranks candidates before full video analysis
+TRIAGE_MODEL = os.getenv("SUMM_DOWN_TRIAGE_MODEL", "gemini-2.0-flash")
+TRIAGE_WORKERS = int(os.getenv("SUMM_DOWN_TRIAGE_WORKERS", "5"))
+TRIAGE_CAPTION_CHARS = 4000
+
+TRIAGE_PROMPT = """
+You are screening candidate videos for a viral trend analysis. You only have the video's
+metadata and captions, not the video itself.
+
+INSTRUCTIONS:
+- Give a "viral_score" from 0 to 100 for how strong and representative a viral example this video is.
+- Fill the analysis from the metadata and captions as well as you can.
+- If a field cannot be determined, fill it with "unknown" (never leave fields empty).
+
+VIDEO METADATA:
+"""
+
+
+def summ_down(video_urls: list[str], clip_seconds: int = 0, clip_windows: str = "",
+              analysis_mode: str = "video", triage_top_k: int = 0, batch_size: int = 0,
+              deadline_seconds: float = 0, min_success: int = 0, segment_seconds: float = 0) -> list[dict]:
     """
     Download videos from TikTok/YouTube and generate AI viral analysis
 
     Args:
         video_urls (List[str]): List of video URLs to process
+        clip_seconds (int): If > 0, analyze only the first N seconds of each video (the hook)
+        clip_windows (str): Analyze only these windows, e.g. "0-8,30-40" (seconds).
+            Takes precedence over clip_seconds.
+        analysis_mode (str): "video" uploads the video itself. "keyframes" sends only
+            scene-change keyframes plus a downsampled audio track (cheaper, faster).
+        triage_top_k (int): If > 0, first score every video from its metadata and captions
+            with a cheap text-only pass and fully analyze only the top K. The others keep
+            their metadata-based analysis and are marked with "tier": "metadata".
+        batch_size (int): If > 1, analyze up to this many videos per Gemini request
+            (further limited by the token and inline-size budget) instead of one each.
+        deadline_seconds (float): If > 0, stop waiting after this many seconds. Videos that
+            are not done by then get an error analysis and "timed_out": True.
+        min_success (int): If > 0, return as soon as this many videos have a successful
+            analysis (cache hits included) and time out the rest the same way.
+        segment_seconds (float): If > 0, videos longer than ~1.5 segments are split into
+            segments of this length that are analyzed in parallel and merged into one
+            analysis. Every video is then downloaded (no URL references).
 
     Returns:
         List[Dict]: List of videos with format:
@@ -416,27 +559,89 @@ def summ_down(video_urls: list[str]) -> list[dict]:
     """
 
     class VideoProcessor:
-        def __init__(self):
+        def __init__(self, windows: list[tuple[float, float]] = None, analysis_mode: str = "video",
+                     triage_top_k: int = 0, batch_size: int = 0, deadline_seconds: float = 0,
+                     min_success: int = 0, segment_seconds: float = 0):
             print("🚀 Initializing Video Processor...")
             self.start_time = time.time()
 
+            if analysis_mode not in ('video', 'keyframes'):
+                raise ValueError(f"Unknown analysis_mode: {analysis_mode}")
+            self.analysis_mode = analysis_mode
+
+            # Quorum mode: return after min_success analyses or deadline_seconds, whichever is first
+            self.deadline_seconds = max(float(deadline_seconds or 0), 0)
+            self.min_success = max(int(min_success or 0), 0)
+            if (self.deadline_seconds or self.min_success) and batch_size and batch_size > 1:
+                raise ValueError("deadline_seconds/min_success are not supported with batch_size > 1")
+            # Set when the quorum or deadline cuts the run short; stragglers stop at their next check
+            self.cancelled = threading.Event()
+
+            # Map-reduce over time segments for long videos (plain video mode only)
+            self.segment_seconds = max(float(segment_seconds or 0), 0)
+            if self.segment_seconds and batch_size and batch_size > 1:
+                raise ValueError("segment_seconds is not supported with batch_size > 1")
+
+            # Only these (start, end) windows are uploaded when set
+            self.windows = windows or []
+            self.cache_variant = ANALYSIS_CACHE_VARIANT
+            if self.windows:
+                window_spec = ','.join(f"{start:g}-{end:g}" for start, end in self.windows)
+                self.cache_variant += f"|clip:{window_spec}"
+                print(f"✂️ Clip mode: analyzing windows {window_spec}s only")
+            if self.analysis_mode != 'video':
+                self.cache_variant += f"|{self.analysis_mode}"
+                print(f"🖼️ Analysis mode: {self.analysis_mode}")
+            if segment_seconds and analysis_mode == 'video' and not self.windows:
+                self.cache_variant += f"|segments:{float(segment_seconds):g}"
+                print(f"🧩 Segmented mode: long videos split into {float(segment_seconds):g}s segments")
+
             # Validate API key
             if not GEMINI_API_KEY or GEMINI_API_KEY == "your_gemini_api_key_here":
                 raise ValueError("Please set your Gemini API key in the GEMINI_API_KEY variable")
             print("✅ Gemini API key validated")
 
             # Setup temporary directory
-            self.temp_dir = Path(tempfile.mkdtemp(prefix="video_summarizer_"))
-            print(f"📂 Temporary directory created: {self.temp_dir}")
+            # Stage videos in memory-backed /dev/shm when it exists, on disk otherwise
+            self.temp_dir, self.staging_backend = make_staging_dir("video_summarizer_")
+            print(f"📂 Temporary directory created: {self.temp_dir} ({self.staging_backend})")
+            # Videos the tmpfs or the memory budget cannot take go to disk instead
+            self.spill_dir = (
+                Path(tempfile.mkdtemp(prefix="video_summarizer_spill_"))
+                if self.staging_backend == 'shm' else self.temp_dir
+            )
+            # Bytes of each file staged in /dev/shm, charged to the memory budget until it is deleted
+            self.staged_bytes = {}
+            self.staged_lock = threading.Lock()
 
             # Configure Gemini AI
             genai.configure(api_key=GEMINI_API_KEY)
             self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
             print("🤖 Gemini AI model configured")
 
+            # (chosen_bytes, best_bytes) per download picked by the format policy
+            self.format_savings = []
+            # Bytes downloaded from copies stored by the scraper actor
+            self.actor_media_bytes = []
+
+            # Text-only triage tier
+            self.triage_top_k = max(int(triage_top_k or 0), 0)
+            self.triage_model = genai.GenerativeModel(TRIAGE_MODEL) if self.triage_top_k else None
+            self.triage_avoided = 0
+
+            # Multi-video requests; 0 or 1 analyzes every video on its own
+            self.batch_size = max(int(batch_size or 0), 0)
+            self.batch_requests = 0
+
+            # Batches only start once every video is prepared, so nothing frees
+            # budget in the meantime - spill right away instead of waiting
+            self.budget_wait = 0 if self.batch_size > 1 else MEDIA_BUDGET_WAIT_SECONDS
+
             # Download configurations
+            # yt-dlp's own downloads have no size known up front, so instead of going to
+            # /dev/shm uncharged they land in the disk spill dir (the temp dir on disk staging)
             self.tiktok_opts = {
-                'outtmpl': str(self.temp_dir / 'TikTok_%(title)s_%(id)s.%(ext)s'),
+                'outtmpl': str(self.spill_dir / 'TikTok_%(title)s_%(id)s.%(ext)s'),
                 'format': 'best[ext=mp4]/best',
                 'writeinfojson': False,
                 'writesubtitles': False,
@@ -444,7 +649,7 @@ def summ_down(video_urls: list[str]) -> list[dict]:
             }
 
             self.youtube_opts = {
-                'outtmpl': str(self.temp_dir / 'YouTube_%(title)s_%(id)s.%(ext)s'),
+                'outtmpl': str(self.spill_dir / 'YouTube_%(title)s_%(id)s.%(ext)s'),
                 'format': 'best[height<=1080][ext=mp4]/best[ext=mp4]',
                 'writeinfojson': False,
                 'writesubtitles': False,
@@ -456,30 +661,12 @@ def summ_down(video_urls: list[str]) -> list[dict]:
             """Detect video platform"""
             print(f"🔍 Detecting platform for: {url}")
 
-            tiktok_patterns = [
-                r'https?://(?:www\.)?tiktok\.com/@[\w.-]+/video/\d+',
-                r'https?://(?:vm|vt)\.tiktok\.com/[\w.-]+',
-                r'https?://(?:www\.)?tiktok\.com/t/[\w.-]+',
-            ]
-
-            youtube_patterns = [
-                r'https?://(?:www\.)?youtube\.com/shorts/[\w-]+',
-                r'https?://youtu\.be/[\w-]+',
-                r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+',
-            ]
-
-            if any(re.match(pattern, url) for pattern in tiktok_patterns):
-                platform = 'tiktok'
-            elif any(re.match(pattern, url) for pattern in youtube_patterns):
-                platform = 'youtube'
-            else:
-                platform = 'unknown'
-
+            platform = video_platform(url)
             print(f"🌐 Platform detected: {platform}")
             return platform
 
-        def download_single_video(self, url: str) -> str:
-            """Download a single video and return the file path"""
+        def download_single_video(self, url: str, meta: dict = None) -> str:
+            """Download a single video and return the file path. meta, if given, receives title and duration."""
             print(f"⬇️ Starting download for: {url}")
 
             platform = self.detect_platform(url)
@@ -488,83 +675,208 @@ def summ_down(video_urls: list[str]) -> list[dict]:
                 print(f"❌ Unsupported platform: {platform}")
                 return None
 
+            # Same video in the same analysis format from an earlier run
+            parsed_id = parse_video_url(url) if MEDIA_CACHE_ENABLED else None
+            if parsed_id:
+                # Into the disk spill dir when staging on /dev/shm: a hard link there costs no memory
+                hit = media_cache.fetch(*parsed_id, ANALYSIS_FORMAT_POLICY, str(self.spill_dir))
+                if hit:
+                    print(f"💽 Media cache hit: {hit['size_bytes'] / 1024 / 1024:.2f} MB, skipping download")
+                    if meta is not None:
+                        meta.update(title=hit['title'], duration=hit['duration'])
+                    return hit['path']
+
+            # The scraper actor already stored this video; fetch that copy instead of going through yt-dlp
+            stored = actor_media.lookup(url) if ACTOR_MEDIA_ENABLED else None
+            if stored:
+                downloaded_file = self.download_stored_media(url, stored)
+                if downloaded_file:
+                    if meta is not None:
+                        meta.update(title=stored['title'] or 'Unknown', duration=stored['duration'] or 0)
+                    if parsed_id:
+                        # Stands in for the analysis format of this video in later runs
+                        try:
+                            media_cache.put(*parsed_id, ANALYSIS_FORMAT_POLICY, downloaded_file,
+                                            title=stored['title'], duration=stored['duration'])
+                        except Exception as e:
+                            print(f"⚠️ Media cache write failed: {str(e)}")
+                    return downloaded_file
+
             # Choose appropriate options
             opts = self.tiktok_opts if platform == 'tiktok' else self.youtube_opts
             print(f"⚙️ Using {platform} download options")
+            downloaded_file = None
 
             try:
                 with yt_dlp.YoutubeDL(opts) as ydl:
                     print("📊 Extracting video info...")
-                    # Get info first
                     info = ydl.extract_info(url, download=False)
                     title = info.get('title', 'Unknown')
                     duration = info.get('duration', 0)
                     print(f"📹 Video info - Title: {title}, Duration: {duration}s")
-
-                    print("⬇️ Starting actual download...")
-                    # Download
-                    ydl.download([url])
-                    print("✅ Download completed")
-
-                    # Find the downloaded file
-                    prefix = 'TikTok_' if platform == 'tiktok' else 'YouTube_'
-                    downloaded_files = list(self.temp_dir.glob(f"{prefix}*"))
-                    print(f"🔍 Looking for files with prefix: {prefix}")
-                    print(f"📁 Found {len(downloaded_files)} files")
-
-                    if downloaded_files:
-                        # Get the most recently created file
-                        latest_file = max(downloaded_files, key=lambda p: p.stat().st_mtime)
-                        file_size = latest_file.stat().st_size / 1024 / 1024  # MB
-                        print(f"✅ Downloaded file: {latest_file.name} ({file_size:.2f} MB)")
-                        return str(latest_file)
+                    if meta is not None:
+                        meta.update(title=title, duration=duration)
+
+                    # Resolve the exact output path; other workers may be
+                    # downloading into the same temp dir at the same time
+                    downloaded_file = Path(ydl.prepare_filename(info))
+
+                    # Smallest stream that is still good enough for analysis
+                    chosen, best = select_analysis_format(info.get('formats'), duration)
+                    if chosen:
+                        chosen_size = format_size(chosen, duration)
+                        best_size = format_size(best, duration)
+                        print(f"🎚️ Analysis format {chosen.get('format_id')} ({short_side(chosen)}p, "
+                              f"{(chosen_size or 0) / 1024 / 1024:.2f} MB) vs best {best.get('format_id')} "
+                              f"({short_side(best)}p, {(best_size or 0) / 1024 / 1024:.2f} MB)")
+                        if chosen_size and best_size:
+                            self.format_savings.append((chosen_size, best_size))
+                        media_url = chosen['url']
+                        headers = chosen.get('http_headers') or info.get('http_headers')
+                        format_id = chosen.get('format_id')
+                        downloaded_file = self.stage_path(
+                            downloaded_file.with_suffix(f".{chosen.get('ext', 'mp4')}").name, chosen_size
+                        )
                     else:
-                        print("❌ No downloaded files found")
-                        return None
+                        # yt-dlp's own pick; only a plain HTTP(S) file can bypass it
+                        # (an HLS pick's url is the .m3u8 manifest, not the video)
+                        media_url = info.get('url') if info.get('protocol') in DIRECT_PROTOCOLS else None
+                        headers = info.get('http_headers')
+                        format_id = info.get('format_id')
+
+                    if media_url:
+                        # Single progressive stream: write it straight to the file Gemini
+                        # uploads from, in parallel byte ranges when the CDN supports them
+                        print("⬇️ Streaming video to staging file...")
+                        stats = download_file(
+                            media_url,
+                            str(downloaded_file),
+                            headers=headers,
+                            cookies=ydl.cookiejar,
+                            # Media URLs are signed per run; resume by video and format instead
+                            resume_key=f"{platform}:{info.get('id')}:{format_id}",
+                            # A straggler past the cut-off stops mid-download instead of finishing it
+                            cancel_event=self.cancelled,
+                        )
+                        print(f"⚡ Streamed {stats['bytes'] / 1024 / 1024:.2f} MB "
+                              f"at {stats['mb_per_s']:.2f} MB/s in {stats['parts']} part(s)")
+                        if stats['resumed_bytes']:
+                            print(f"↩️ Resumed {stats['resumed_bytes'] / 1024 / 1024:.2f} MB from a partial download")
+                    else:
+                        # Streaming manifests (HLS/DASH) and separate video/audio
+                        # streams need yt-dlp to fetch and merge the pieces
+                        print("⬇️ Starting yt-dlp download...")
+                        ydl.process_info(info)
+
+                if downloaded_file.exists():
+                    file_size = downloaded_file.stat().st_size / 1024 / 1024  # MB
+                    print(f"✅ Downloaded file: {downloaded_file.name} ({file_size:.2f} MB)")
+                    if parsed_id:
+                        try:
+                            media_cache.put(*parsed_id, ANALYSIS_FORMAT_POLICY, str(downloaded_file),
+                                            title=title, duration=duration)
+                        except Exception as e:
+                            print(f"⚠️ Media cache write failed: {str(e)}")
+                    return str(downloaded_file)
+                else:
+                    print("❌ No downloaded files found")
+                    self.discard_staged(downloaded_file)
+                    return None
 
             except Exception as e:
                 print(f"❌ Download failed with error: {str(e)}")
+                if downloaded_file is not None:
+                    self.discard_staged(downloaded_file)
                 return None
 
+        def download_stored_media(self, url: str, stored: dict) -> str | None:
+            """Download the copy of a video stored by the scraper actor; None to fall back to yt-dlp"""
+            platform, video_id = parse_video_url(url)
+            media_url = stored['media_url']
+            # Only /dev/shm staging needs the size up front (room check and memory budget);
+            # on disk, skip the extra HEAD round trip
+            size = expected_size(media_url, stored['duration']) if self.spill_dir != self.temp_dir else None
+            downloaded_file = self.stage_path(f"{platform}_{video_id}.mp4", size)
+
+            print("📦 Downloading the copy stored by the scraper actor, skipping yt-dlp")
+            try:
+                stats = download_file(
+                    media_url,
+                    str(downloaded_file),
+                    headers=auth_headers(media_url),
+                    resume_key=f"{platform}:{video_id}:actor",
+                    # An expired storage answers 404; yt-dlp is the better retry
+                    retries=1,
+                    cancel_event=self.cancelled,
+                )
+            except DownloadCancelled:
+                # Past the cut-off; the stored copy is fine, so keep the reference
+                self.discard_staged(downloaded_file)
+                raise
+            except Exception as e:
+                print(f"⚠️ Stored copy unavailable, falling back to yt-dlp: {str(e)}")
+                actor_media.forget(url)
+                self.discard_staged(downloaded_file)
+                return None
+
+            print(f"⚡ Streamed {stats['bytes'] / 1024 / 1024:.2f} MB "
+                  f"at {stats['mb_per_s']:.2f} MB/s in {stats['parts']} part(s)")
+            self.actor_media_bytes.append(stats['bytes'])
+            return str(downloaded_file)
+
+        def stage_path(self, filename: str, size: int | None) -> Path:
+            """
+            Where to stage a download of about size bytes.
+
+            On the shm backend the file goes to /dev/shm only if the tmpfs has
+            room and the memory budget admits it right away; the bytes stay
+            charged until discard_staged(). Anything else, including downloads
+            of unknown size, is staged in the disk spill dir.
+            """
+            if self.spill_dir == self.temp_dir:
+                return self.temp_dir / filename
+            if size and has_room(self.temp_dir, size) and media_budget.acquire(size, timeout=0):
+                path = self.temp_dir / filename
+                with self.staged_lock:
+                    self.staged_bytes[str(path)] = self.staged_bytes.get(str(path), 0) + size
+                return path
+            print("💽 No room in /dev/shm or the memory budget, staging this video on disk")
+            return self.spill_dir / filename
+
+        def discard_staged(self, path: str | Path):
+            """Delete a staged file and return its /dev/shm bytes to the memory budget"""
+            Path(path).unlink(missing_ok=True)
+            with self.staged_lock:
+                size = self.staged_bytes.pop(str(path), 0)
+            if size:
+                media_budget.release(size)
+
         def parse_json_response(self, response_text: str) -> dict:
             """Parse and validate the JSON response from Gemini"""
+            # Clean the response text - remove any markdown formatting or extra text
+            cleaned_text = response_text.strip()
+
+            # If response starts with ```json, extract just the JSON part
+            if cleaned_text.startswith('```json'):
+                start_idx = cleaned_text.find('{')
+                end_idx = cleaned_text.rfind('}') + 1
+                if start_idx != -1 and end_idx != 0:
+                    cleaned_text = cleaned_text[start_idx:end_idx]
+
             try:
-                # Clean the response text - remove any markdown formatting or extra text
-                cleaned_text = response_text.strip()
-
-                # If response starts with ```json, extract just the JSON part
-                if cleaned_text.startswith('```json'):
-                    start_idx = cleaned_text.find('{')
-                    end_idx = cleaned_text.rfind('}') + 1
-                    if start_idx != -1 and end_idx != 0:
-                        cleaned_text = cleaned_text[start_idx:end_idx]
-
-                # Parse JSON
-                analysis_data = json.loads(cleaned_text)
-
-                # Validate required fields (updated to include summary)
-                required_fields = ['viral_ingredients', 'video_hooks', 'hook_pattern', 'summary', 'storytelling_blueprint']
-                for field in required_fields:
-                    if field not in analysis_data:
-                        raise ValueError(f"Missing required field: {field}")
-
-                # Validate storytelling_blueprint structure
-                blueprint = analysis_data['storytelling_blueprint']
-                blueprint_fields = ['genre', 'theme', 'target_emotion', 'pov', 'setting', 'characters', 'conflict',
-                                    'escalating_stakes', 'payoff']
-                for field in blueprint_fields:
-                    if field not in blueprint:
-                        raise ValueError(f"Missing storytelling_blueprint field: {field}")
-
-                return analysis_data
-
-            except json.JSONDecodeError as e:
-                print(f"⚠️ JSON parsing error: {str(e)}")
+                return VideoAnalysis.model_validate_json(cleaned_text).model_dump()
+            except ValidationError as e:
+                print(f"⚠️ Analysis validation error: {str(e)}")
                 print(f"Raw response: {response_text[:200]}...")
-                return self.create_error_analysis(f"Invalid JSON response: {str(e)}")
-            except Exception as e:
+                return self.create_error_analysis(f"Analysis validation failed: {e.error_count()} error(s)")
+
+        def validate_analysis(self, analysis_data: dict) -> dict:
+            """Validate an already decoded analysis (batch entries)"""
+            try:
+                return VideoAnalysis.model_validate(analysis_data).model_dump()
+            except ValidationError as e:
                 print(f"⚠️ Analysis validation error: {str(e)}")
-                return self.create_error_analysis(f"Analysis validation failed: {str(e)}")
+                return self.create_error_analysis(f"Analysis validation failed: {e.error_count()} error(s)")
 
         def create_error_analysis(self, error_msg: str) -> dict:
             """Create a fallback analysis structure for errors"""
@@ -586,89 +898,158 @@ def summ_down(video_urls: list[str]) -> list[dict]:
                 }
             }
 
-        def analyze_video(self, video_path: str, url: str) -> dict:
-            """Generate video analysis using Gemini 2.0 Flash"""
-            print(f"🤖 Starting AI analysis for: {Path(video_path).name}")
+        def upload_video(self, video_path: str) -> object:
+            """Upload a downloaded video to Gemini and wait for processing"""
+            if GEMINI_FILE_REGISTRY_ENABLED:
+                # Reuses a live upload of the same bytes from an earlier run
+                return gemini_files.upload(video_path, cancel_event=self.cancelled)
 
+            print(f"☁️ Uploading video to Gemini: {Path(video_path).name}")
+            video_file = genai.upload_file(path=video_path)
+            print(f"✅ Upload successful, file ID: {video_file.name}")
+
+            # Wait for processing
+            print("⏳ Waiting for Gemini processing...")
             try:
-                # Upload video to Gemini
-                print("☁️ Uploading video to Gemini...")
-                video_file = genai.upload_file(path=video_path)
-                print(f"✅ Upload successful, file ID: {video_file.name}")
-
-                # Wait for processing
-                print("⏳ Waiting for Gemini processing...")
-                processing_time = 0
-                while video_file.state.name == "PROCESSING":
-                    time.sleep(2)
-                    processing_time += 2
-                    video_file = genai.get_file(video_file.name)
-                    print(f"   Processing... ({processing_time}s elapsed)")
-
-                if video_file.state.name == "FAILED":
-                    print("❌ Gemini video processing failed")
-                    raise ValueError("Video processing failed")
-
-                print("✅ Gemini processing complete!")
+                video_file = wait_for_processing(video_file, cancel_event=self.cancelled)
+            except TimeoutError:
+                genai.delete_file(video_file.name)
+                raise
 
+            if video_file.state.name == "FAILED":
+                print("❌ Gemini video processing failed")
+                genai.delete_file(video_file.name)
+                raise ValueError("Video processing failed")
+
+            print(f"✅ Gemini processing complete: {video_file.name}")
+            return video_file
+
+        def inline_video_part(self, video_path: str) -> dict:
+            """Build an inline generate_content part for a small clip"""
+            mime_type = mimetypes.guess_type(video_path)[0] or 'video/mp4'
+            return {'mime_type': mime_type, 'data': Path(video_path).read_bytes()}
+
+        def url_video_part(self, url: str) -> dict:
+            """Build a generate_content part that references the video by URL"""
+            return {'file_data': {'file_uri': canonical_video_url(url), 'mime_type': 'video/mp4'}}
+
+        def keyframe_parts(self, job: dict) -> list:
+            """
+            Replace the video with scene-change keyframes and a downsampled audio track.
+
+            Frames and audio are written to files first, so their exact size is
+            reserved from the memory budget before any of it is read. When the
+            budget does not admit them they go through the File API instead.
+            """
+            video_path = job['video_path']
+            stem = str(Path(video_path).with_suffix(''))
+            timestamps = detect_scene_cuts(video_path)
+            files = [(path, 'image/jpeg') for path in extract_keyframes(video_path, timestamps, f"{stem}_keyframe")]
+            try:
+                if not files:
+                    raise ValueError("No frames could be decoded from the video")
+                audio_path = extract_audio(video_path, f"{stem}.aac")
+                if audio_path:
+                    files.append((audio_path, 'audio/aac'))
+
+                size = sum(Path(path).stat().st_size for path, _ in files)
+                if self.admit_in_memory(size):
+                    try:
+                        parts = [{'mime_type': mime_type, 'data': Path(path).read_bytes()} for path, mime_type in files]
+                    except Exception:
+                        media_budget.release(size)
+                        raise
+                else:
+                    parts = []
+                    try:
+                        for path, _ in files:
+                            parts.append(self.upload_video(path))
+                    except Exception:
+                        self.release_video_part(parts)
+                        raise
+            finally:
+                for path, _ in files:
+                    Path(path).unlink(missing_ok=True)
+
+            job['prompt_note'] = (
+                f"\nNOTE: Instead of the full video you are given {len(timestamps)} keyframes, one per scene, "
+                f"taken at {', '.join(f'{t:.1f}s' for t in timestamps)}"
+                f"{' followed by the audio track' if audio_path else ''}. Treat them as the video.\n"
+            )
+            job['upload_bytes'] = size
+            return parts
+
+        def generate_analysis(self, video_part: object, prompt_note: str = "") -> dict:
+            """Generate the viral analysis for an uploaded Gemini file or inline/URL/keyframe parts"""
+            uploaded = isinstance(video_part, genai.types.File)
+            parts = video_part if isinstance(video_part, list) else [video_part]
+            try:
                 # Generate analysis
-                print("📝 Generating AI analysis...")
-                prompt = """
-                You are a Video Analysis & Viral Pattern Extraction Agent.  
-
-                INSTRUCTIONS:  
-                - Analyze the uploaded video directly (not summaries, not transcripts).  
-                - Identify viral ingredients, storytelling DNA, emotional triggers, pacing, editing style, and hooks.  
-                - Capture the genre, theme, target emotions, POV, setting, characters, conflict, stakes, and payoff.  
-                - Output ONLY a single JSON object. Do not add any extra text, explanations, or formatting.  
-                - All array fields must contain at least one value.  
-                - If a field cannot be determined, fill it with "unknown" (never leave fields empty).  
-                - Follow the schema exactly.  
-
-                OUTPUT SCHEMA:  
-
-                {
-                  "viral_ingredients": ["<ingredient_1>", "<ingredient_2>", "..."],
-                  "video_hooks": ["<hook_1>", "<hook_2>", "..."],
-                  "hook_pattern": "<concise_description>",
-                  "summary": "<summary of whole video>",
-                  "storytelling_blueprint": {
-                    "genre": "<genre>",
-                    "theme": "<theme>",
-                    "target_emotion": "<emotion>",
-                    "pov": "<point_of_view>",
-                    "setting": "<setting>",
-                    "characters": ["<char_1>", "<char_2>", "..."],
-                    "conflict": "<conflict>",
-                    "escalating_stakes": "<description>",
-                    "payoff": "<resolution_or_twist>"
-                  }
-                }
+                label = video_part.name if uploaded else f"{len(parts)} inline part(s)"
+                print(f"📝 Generating AI analysis for {label}...")
+                prompt = ANALYSIS_PROMPT + self.window_note() + prompt_note
 
-                """
-
-                response = self.model.generate_content([video_file, prompt])
+                response = self.model.generate_content([*parts, prompt], generation_config=ANALYSIS_GENERATION_CONFIG)
                 print("✅ Analysis generated successfully!")
-
-                # Clean up uploaded file
+            finally:
+                # Clean up uploaded file, even when generation fails
+                self.release_video_part(video_part)
+
+            # Parse the JSON response
+            return self.parse_json_response(response.text)
+
+        def window_note(self) -> str:
+            """Prompt note telling Gemini it only sees the clip windows"""
+            if not self.windows:
+                return ""
+            window_spec = ', '.join(f"{start:g}s-{end:g}s" for start, end in self.windows)
+            return (f"\nNOTE: You are only seeing excerpts of the video ({window_spec}). "
+                    f"Base the analysis on these excerpts and focus on the hooks.\n")
+
+        def media_part(self, video_path: str) -> tuple[object, str]:
+            """Inline part for small files that fit the memory budget, uploaded Gemini file otherwise"""
+            file_bytes = Path(video_path).stat().st_size
+            if file_bytes <= INLINE_VIDEO_MAX_BYTES and self.admit_in_memory(file_bytes):
+                # Small clips skip the upload, PROCESSING poll and delete round trips
+                print(f"📎 Sending {file_bytes / 1024 / 1024:.2f} MB clip inline")
+                try:
+                    return self.inline_video_part(video_path), 'inline'
+                except Exception:
+                    media_budget.release(file_bytes)
+                    raise
+            return self.upload_video(video_path), 'file_api'
+
+        def admit_in_memory(self, size: int) -> bool:
+            """Reserve in-memory media budget, or report that the video must stay on disk"""
+            if media_budget.acquire(size, timeout=self.budget_wait):
+                return True
+            print(f"💽 Memory budget full, sending {size / 1024 / 1024:.2f} MB through the File API instead")
+            return False
+
+        def part_bytes(self, video_part: object) -> int:
+            """Bytes of media an inline or keyframe part holds in memory"""
+            parts = video_part if isinstance(video_part, list) else [video_part]
+            return sum(len(part['data']) for part in parts if isinstance(part, dict) and 'data' in part)
+
+        def release_video_part(self, video_part: object):
+            """Return in-memory parts to the budget and delete uploaded Gemini files"""
+            held = self.part_bytes(video_part)
+            if held:
+                media_budget.release(held)
+            # Keyframe parts that did not fit the budget are a list of uploaded files
+            for part in video_part if isinstance(video_part, list) else [video_part]:
+                if not isinstance(part, genai.types.File):
+                    continue
+                if GEMINI_FILE_REGISTRY_ENABLED:
+                    # Registered uploads stay on Gemini for reuse until they expire
+                    gemini_files.release(part)
+                    continue
                 print("🗑️ Cleaning up Gemini file...")
-                genai.delete_file(video_file.name)
-                print("✅ Gemini file deleted")
-
-                # Parse the JSON response
-                analysis_data = self.parse_json_response(response.text)
-
-                return {
-                    'url': url,
-                    'analysis': analysis_data
-                }
-
-            except Exception as e:
-                print(f"❌ Analysis failed with error: {str(e)}")
-                return {
-                    'url': url,
-                    'analysis': self.create_error_analysis(str(e))
-                }
+                try:
+                    genai.delete_file(part.name)
+                    print("✅ Gemini file deleted")
+                except Exception as e:
+                    print(f"⚠️ Failed to delete Gemini file: {str(e)}")
 
         def format_processing_time(self, seconds: float) -> str:
             """Format processing time as HH:MM:SS"""
@@ -680,16 +1061,518 @@ def summ_down(video_urls: list[str]) -> list[dict]:
         def cleanup_all_files(self):
             """Clean up all temporary files"""
             print("🧹 Starting cleanup of temporary files...")
+            with self.staged_lock:
+                staged, self.staged_bytes = sum(self.staged_bytes.values()), {}
+            if staged:
+                media_budget.release(staged)
+            for directory in {self.temp_dir, self.spill_dir}:
+                try:
+                    if directory.exists():
+                        file_count = len(list(directory.glob("*")))
+                        print(f"🗑️ Deleting {file_count} temporary files...")
+                        shutil.rmtree(directory)
+                        print("✅ Temporary directory cleaned up")
+                    else:
+                        print("ℹ️ Temporary directory already cleaned")
+                except Exception as e:
+                    print(f"⚠️ Cleanup failed: {str(e)}")
+
+        def check_cancelled(self, stage: str):
+            """Stop a straggler before it starts another stage after the quorum/deadline cut-off"""
+            if self.cancelled.is_set():
+                raise PipelineTimeout(f"Timed out before {stage}")
+
+        def remaining_seconds(self) -> float | None:
+            """Time left until the deadline, or None without one"""
+            if not self.deadline_seconds:
+                return None
+            return max(self.deadline_seconds - (time.time() - self.start_time), 0.0)
+
+        def discard_straggler(self, value: object):
+            """Release what a job finished after the cut-off still holds"""
+            if isinstance(value, dict) and 'video_part' in value:
+                self.release_video_part(value.pop('video_part'))
+            if isinstance(value, dict) and 'video_path' in value:
+                self.discard_staged(value['video_path'])
+
+        def download_stage(self, job: dict) -> dict:
+            """Pipeline stage 1: download the source video to the temp dir"""
+            self.check_cancelled('download')
+            print(f"\n--- Video {job['index'] + 1} download ---")
+            direct_url = self.detect_platform(job['url']) in DIRECT_URL_PLATFORMS
+            # Clip windows, keyframes and segments are made locally, so they always need the bytes
+            local_only = self.windows or self.analysis_mode == 'keyframes' or self.segment_seconds
+            if direct_url and not local_only and not job.get('url_rejected'):
+                # Gemini fetches the video itself, no bytes cross our network
+                print("🔗 Sending video to Gemini as a URL reference")
+                job['video_part'] = self.url_video_part(job['url'])
+                job['delivery'] = 'url'
+                return job
+
+            start = time.perf_counter()
+            video_path = self.download_single_video(job['url'], meta=job)
+            job['timings']['download'] = time.perf_counter() - start
+            if not video_path:
+                raise ValueError('Download failed')
+            job['video_path'] = video_path
+            job['source_bytes'] = Path(video_path).stat().st_size
+            job['upload_bytes'] = job['source_bytes']
+
+            if self.windows:
+                start = time.perf_counter()
+                clip_path = str(Path(video_path).with_name(f"clip_{job['index']}.mp4"))
+                try:
+                    cut_windows(video_path, self.windows, clip_path)
+                finally:
+                    self.discard_staged(video_path)
+                job['timings']['clip'] = time.perf_counter() - start
+                job['video_path'] = clip_path
+                job['upload_bytes'] = Path(clip_path).stat().st_size
+                print(f"✂️ Clipped {job['source_bytes'] / 1024 / 1024:.2f} MB → "
+                      f"{job['upload_bytes'] / 1024 / 1024:.2f} MB")
+            elif self.should_segment(job):
+                start = time.perf_counter()
+                try:
+                    job['segments'] = split_segments(
+                        video_path, self.segment_seconds, str(Path(video_path).parent), f"segment_{job['index']}"
+                    )
+                finally:
+                    self.discard_staged(video_path)
+                job['timings']['segment'] = time.perf_counter() - start
+                job['delivery'] = 'segmented'
+                print(f"🧩 Split {job.get('duration', 0):.0f}s video into {len(job['segments'])} segments")
+            return job
+
+        def should_segment(self, job: dict) -> bool:
+            """Segment long plain videos when segmented mode is on"""
+            return bool(
+                self.segment_seconds
+                and self.analysis_mode == 'video'
+                and not self.windows
+                and (job.get('duration') or 0) > self.segment_seconds * SEGMENT_MIN_RATIO
+            )
+
+        def upload_stage(self, job: dict) -> dict:
+            """Pipeline stage 2: upload to Gemini and wait for PROCESSING to finish"""
+            self.check_cancelled('upload')
+            print(f"\n--- Video {job['index'] + 1} upload ---")
+            if job.get('delivery') in ('url', 'segmented'):
+                # Segments are uploaded by the analysis stage, each next to its own analysis
+                return job
+
+            start = time.perf_counter()
             try:
-                if self.temp_dir.exists():
-                    file_count = len(list(self.temp_dir.glob("*")))
-                    print(f"🗑️ Deleting {file_count} temporary files...")
-                    shutil.rmtree(self.temp_dir)
-                    print("✅ Temporary directory cleaned up")
+                if self.analysis_mode == 'keyframes':
+                    job['video_part'] = self.keyframe_parts(job)
+                    job['delivery'] = 'keyframes'
+                    print(f"🖼️ Sending {len(job['video_part'])} keyframe/audio parts "
+                          f"({job['upload_bytes'] / 1024:.0f} KB) instead of "
+                          f"{job['source_bytes'] / 1024 / 1024:.2f} MB of video")
                 else:
-                    print("ℹ️ Temporary directory already cleaned")
+                    job['video_part'], job['delivery'] = self.media_part(job['video_path'])
+            finally:
+                # The local copy is no longer needed once Gemini has it
+                self.discard_staged(job['video_path'])
+                job['timings']['upload'] = time.perf_counter() - start
+            return job
+
+        def analysis_stage(self, job: dict) -> dict:
+            """Pipeline stage 3: generate the viral analysis"""
+            self.check_cancelled('analysis')
+            print(f"\n--- Video {job['index'] + 1} analysis ---")
+            start = time.perf_counter()
+            try:
+                if job.get('delivery') == 'segmented':
+                    analysis = self.analyze_segments(job)
+                else:
+                    analysis = self.generate_analysis(job.pop('video_part'), job.get('prompt_note', ''))
+            except URL_REJECTED_ERRORS as e:
+                if job.get('delivery') != 'url':
+                    raise
+                # Private, age-gated or otherwise unreadable by Gemini - fetch it ourselves
+                print(f"⚠️ URL reference rejected ({str(e)}), falling back to download")
+                job['url_rejected'] = True
+                self.upload_stage(self.download_stage(job))
+                self.check_cancelled('analysis')
+                start = time.perf_counter()
+                analysis = self.generate_analysis(job.pop('video_part'), job.get('prompt_note', ''))
+            finally:
+                job['timings']['analysis'] = time.perf_counter() - start
+
+            return self.finish_job(job, analysis)
+
+        def analyze_segments(self, job: dict) -> dict:
+            """Map: analyze every segment in parallel. Reduce: merge them into one analysis."""
+            segments = job.pop('segments')
+            count = len(segments)
+
+            def analyze_segment(numbered: tuple) -> dict:
+                number, (path, seg_start, seg_end) = numbered
+                try:
+                    self.check_cancelled('segment analysis')
+                    try:
+                        part, _ = self.media_part(path)
+                    finally:
+                        Path(path).unlink(missing_ok=True)
+                    self.check_cancelled('segment analysis')
+                    note = (f"\nNOTE: This is segment {number} of {count} of a longer video, covering "
+                            f"{seg_start:.0f}s-{seg_end:.0f}s. Analyze this segment only.\n")
+                    return self.generate_analysis(part, note)
+                except Exception as e:
+                    print(f"⚠️ Segment {number}/{count} failed: {str(e)}")
+                    return self.create_error_analysis(f"Segment {number} failed: {str(e)}")
+
+            print(f"🧩 Analyzing {count} segments with {SEGMENT_WORKERS} workers...")
+            with ThreadPoolExecutor(max_workers=max(1, SEGMENT_WORKERS)) as pool:
+                analyses = list(pool.map(analyze_segment, enumerate(segments, 1)))
+
+            succeeded = [
+                (segment, analysis) for segment, analysis in zip(segments, analyses)
+                if not self.is_error_analysis(analysis)
+            ]
+            if not succeeded:
+                return analyses[0]
+            if len(succeeded) < count:
+                print(f"⚠️ Merging {len(succeeded)} of {count} segments")
+            return self.reduce_segment_analyses(succeeded)
+
+        def reduce_segment_analyses(self, succeeded: list[tuple]) -> dict:
+            """Merge per-segment analyses with a text-only request, or locally if that fails"""
+            segment_data = [
+                {'start_seconds': round(seg_start), 'end_seconds': round(seg_end), 'analysis': analysis}
+                for (_, seg_start, seg_end), analysis in succeeded
+            ]
+            try:
+                response = self.model.generate_content(
+                    SEGMENT_REDUCE_PROMPT + json.dumps(segment_data, ensure_ascii=False),
+                    generation_config=ANALYSIS_GENERATION_CONFIG,
+                )
+                analysis = self.parse_json_response(response.text)
+                if not self.is_error_analysis(analysis):
+                    return analysis
+            except Exception as e:
+                print(f"⚠️ Segment merge request failed ({str(e)}), merging locally")
+            return self.merge_segment_analyses([analysis for _, analysis in succeeded])
+
+        def merge_segment_analyses(self, analyses: list[dict]) -> dict:
+            """Deterministic merge: opening segment for hooks, closing segment for the payoff"""
+            def unique(values: list) -> list:
+                return list(dict.fromkeys(v for v in values if v and v != 'unknown')) or ['unknown']
+
+            first, last = analyses[0], analyses[-1]
+            blueprints = [a['storytelling_blueprint'] for a in analyses]
+            blueprint = dict(first['storytelling_blueprint'])
+            blueprint['characters'] = unique([c for b in blueprints for c in b.get('characters', [])])
+            blueprint['escalating_stakes'] = ' '.join(b.get('escalating_stakes', '') for b in blueprints).strip()
+            blueprint['payoff'] = last['storytelling_blueprint'].get('payoff', 'unknown')
+            return {
+                'viral_ingredients': unique([v for a in analyses for v in a.get('viral_ingredients', [])]),
+                'video_hooks': unique([h for a in analyses for h in a.get('video_hooks', [])]),
+                'hook_pattern': first.get('hook_pattern', 'unknown'),
+                'summary': ' '.join(a.get('summary', '') for a in analyses).strip(),
+                'storytelling_blueprint': blueprint,
+            }
+
+        def finish_job(self, job: dict, analysis: dict) -> dict:
+            """Publish a finished analysis to the cache and build the result item"""
+            # Release any sessions waiting on this video as soon as we have it
+            if job.get('cache_key'):
+                summary_cache.complete(
+                    job['cache_key'],
+                    analysis,
+                    source_bytes=job.get('source_bytes', 0),
+                    store=not self.is_error_analysis(analysis),
+                )
+
+            return {
+                'url': job['url'],
+                'analysis': analysis
+            }
+
+        def estimate_tokens(self, job: dict) -> int:
+            """Rough prompt token cost of one prepared video"""
+            duration = job.get('duration') or DEFAULT_VIDEO_SECONDS
+            if self.windows:
+                duration = min(duration, sum(end - start for start, end in self.windows))
+            if job.get('delivery') == 'keyframes':
+                images = sum(
+                    1 for part in job['video_part']
+                    if (part['mime_type'] if isinstance(part, dict) else part.mime_type).startswith('image/')
+                )
+                return images * IMAGE_TOKENS + int(duration * AUDIO_TOKENS_PER_SECOND)
+            return int(duration * VIDEO_TOKENS_PER_SECOND)
+
+        def plan_batches(self, jobs: list[dict]) -> list[list[dict]]:
+            """Group prepared jobs into requests bounded by batch_size, tokens and inline bytes"""
+            batches, current, tokens, inline_bytes = [], [], 0, 0
+            for job in jobs:
+                job_tokens = self.estimate_tokens(job)
+                # Keyframes sent through the File API hold no inline bytes
+                job_inline = self.part_bytes(job['video_part']) if job.get('delivery') in ('inline', 'keyframes') else 0
+
+                over_budget = (
+                    len(current) >= self.batch_size
+                    or tokens + job_tokens > BATCH_MAX_TOKENS
+                    or inline_bytes + job_inline > BATCH_MAX_INLINE_BYTES
+                )
+                if current and over_budget:
+                    batches.append(current)
+                    current, tokens, inline_bytes = [], 0, 0
+
+                current.append(job)
+                tokens += job_tokens
+                inline_bytes += job_inline
+
+            if current:
+                batches.append(current)
+            return batches
+
+        def analyze_single(self, job: dict) -> object:
+            """analysis_stage that returns the exception instead of raising"""
+            try:
+                return self.analysis_stage(job)
             except Exception as e:
-                print(f"⚠️ Cleanup failed: {str(e)}")
+                return e
+
+        def analyze_batch(self, batch: list[dict]) -> dict:
+            """
+            Analyze several prepared videos with one generate_content call.
+
+            Returns:
+                dict: {job index: result item or exception}
+            """
+            if len(batch) == 1:
+                return {batch[0]['index']: self.analyze_single(batch[0])}
+
+            print(f"\n📦 Analyzing videos {[job['index'] + 1 for job in batch]} in one request...")
+            contents = []
+            for n, job in enumerate(batch, 1):
+                contents.append(f"VIDEO {n} ({job['url']}){job.get('prompt_note', '')}")
+                part = job['video_part']
+                contents.extend(part if isinstance(part, list) else [part])
+            contents.append(BATCH_PROMPT.format(count=len(batch)) + self.window_note())
+
+            start = time.perf_counter()
+            try:
+                response = self.model.generate_content(
+                    contents,
+                    generation_config=BATCH_GENERATION_CONFIG,
+                )
+                entries = json.loads(response.text)
+                self.batch_requests += 1
+            except Exception as e:
+                # Fall back to one request per video (this also handles rejected URL references)
+                print(f"⚠️ Batch request failed ({str(e)}), analyzing videos one by one")
+                return {job['index']: self.analyze_single(job) for job in batch}
+            elapsed = time.perf_counter() - start
+
+            by_number = {
+                entry.get('video'): entry.get('analysis')
+                for entry in entries if isinstance(entry, dict)
+            }
+
+            results = {}
+            for n, job in enumerate(batch, 1):
+                analysis = by_number.get(n)
+                if not isinstance(analysis, dict):
+                    print(f"⚠️ Batch response is missing video {job['index'] + 1}, analyzing it alone")
+                    results[job['index']] = self.analyze_single(job)
+                    continue
+
+                self.release_video_part(job.pop('video_part'))
+                job['timings']['analysis'] = elapsed
+                results[job['index']] = self.finish_job(job, self.validate_analysis(analysis))
+
+            print(f"✅ Batch of {len(batch)} analyzed in {elapsed:.1f}s")
+            return results
+
+        def run_batches(self, jobs: list[dict], prepared: list) -> list:
+            """Analyze the jobs that made it through download/upload in budgeted batches"""
+            ready = [job for job, result in zip(jobs, prepared) if not isinstance(result, Exception)]
+            batches = self.plan_batches(ready)
+            print(f"\n📦 Batch mode: {len(ready)} videos in {len(batches)} request(s)")
+
+            analyzed = {}
+            with ThreadPoolExecutor(max_workers=max(1, ANALYSIS_WORKERS)) as pool:
+                for batch_results in pool.map(self.analyze_batch, batches):
+                    analyzed.update(batch_results)
+
+            return [
+                result if isinstance(result, Exception) else analyzed[job['index']]
+                for job, result in zip(jobs, prepared)
+            ]
+
+        def is_error_analysis(self, analysis: dict) -> bool:
+            """Check whether an analysis is the create_error_analysis fallback"""
+            return 'Error' in str(analysis.get('hook_pattern', ''))
+
+        def fetch_caption_text(self, info: dict) -> str:
+            """Fetch uploaded or automatic captions as plain text (English preferred)"""
+            for tracks in (info.get('subtitles') or {}, info.get('automatic_captions') or {}):
+                lang = next((lang for lang in tracks if lang.startswith('en')), None) or next(iter(tracks), None)
+                if not lang:
+                    continue
+                track = next((t for t in tracks[lang] if t.get('ext') == 'vtt'), None)
+                if not track:
+                    continue
+
+                response = requests.get(track['url'], timeout=15)
+                response.raise_for_status()
+
+                lines = []
+                for line in response.text.splitlines():
+                    line = re.sub(r'<[^>]+>', '', line).strip()
+                    if not line or line == 'WEBVTT' or '-->' in line or line.isdigit() or line.startswith(('Kind:', 'Language:')):
+                        continue
+                    # Automatic captions repeat each line while it scrolls
+                    if not lines or lines[-1] != line:
+                        lines.append(line)
+                return ' '.join(lines)[:TRIAGE_CAPTION_CHARS]
+            return ''
+
+        def triage_candidate(self, job: dict) -> tuple[float, dict]:
+            """Score one video from its metadata and captions without downloading it"""
+            platform = self.detect_platform(job['url'])
+            opts = self.tiktok_opts if platform == 'tiktok' else self.youtube_opts
+
+            try:
+                with yt_dlp.YoutubeDL(opts) as ydl:
+                    info = ydl.extract_info(job['url'], download=False)
+
+                try:
+                    captions = self.fetch_caption_text(info)
+                except Exception as e:
+                    print(f"⚠️ Captions unavailable for {job['url']}: {str(e)}")
+                    captions = ''
+
+                metadata = {
+                    'title': info.get('title'),
+                    'description': (info.get('description') or '')[:1500],
+                    'tags': (info.get('tags') or [])[:30],
+                    'duration': info.get('duration'),
+                    'view_count': info.get('view_count'),
+                    'like_count': info.get('like_count'),
+                    'comment_count': info.get('comment_count'),
+                    'uploader': info.get('uploader'),
+                    'captions': captions,
+                }
+                response = self.triage_model.generate_content(
+                    TRIAGE_PROMPT + json.dumps(metadata, ensure_ascii=False),
+                    generation_config=TRIAGE_GENERATION_CONFIG,
+                )
+                result = TriageResult.model_validate_json(response.text)
+                score, analysis = result.viral_score, result.analysis.model_dump()
+                print(f"🔎 Triage score {score:.0f} for video {job['index'] + 1}")
+                return score, analysis
+
+            except Exception as e:
+                print(f"⚠️ Triage failed for {job['url']}: {str(e)}")
+                return -1.0, self.create_error_analysis(f"Triage failed: {str(e)}")
+
+        def triage(self, jobs: list[dict]) -> tuple[list[dict], dict]:
+            """
+            Rank jobs with the text-only tier and keep only the top K for full analysis.
+
+            Returns:
+                tuple: (finalist jobs in input order, {index: metadata-tier result})
+            """
+            print(f"\n🔎 TRIAGE: scoring {len(jobs)} candidates on metadata and captions...")
+            with ThreadPoolExecutor(max_workers=TRIAGE_WORKERS) as pool:
+                scored = list(pool.map(self.triage_candidate, jobs))
+
+            ranked = sorted(zip(jobs, scored), key=lambda pair: pair[1][0], reverse=True)
+            finalists, triaged = [], {}
+
+            for rank, (job, (score, analysis)) in enumerate(ranked):
+                job['triage_score'] = score
+                if rank < self.triage_top_k:
+                    finalists.append(job)
+                    continue
+
+                # Metadata-only analyses are not stored under the full-analysis cache key
+                if job.get('cache_key'):
+                    summary_cache.complete(job['cache_key'], analysis, store=False)
+                triaged[job['index']] = {
+                    'url': job['url'],
+                    'analysis': analysis,
+                    'tier': 'metadata',
+                    'triage_score': score,
+                }
+
+            self.triage_avoided += len(triaged)
+            print(f"🏁 Triage finalists: {[job['index'] + 1 for job in sorted(finalists, key=lambda j: j['index'])]}, "
+                  f"{len(triaged)} full analyses avoided")
+            return sorted(finalists, key=lambda job: job['index']), triaged
+
+        def collapse_duplicates(self, video_urls: list[str]) -> tuple[list[str], list[int]]:
+            """
+            Resolve short links and keep one URL per (platform, video_id).
+
+            Returns:
+                tuple: (unique resolved URLs, position in that list for every original URL)
+            """
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                resolved = list(pool.map(resolve_video_url, video_urls))
+
+            unique_urls, positions, fan_out = [], {}, []
+            for url in resolved:
+                key = video_cache_key(url)
+                if key not in positions:
+                    positions[key] = len(unique_urls)
+                    unique_urls.append(url)
+                fan_out.append(positions[key])
+
+            duplicates = len(video_urls) - len(unique_urls)
+            if duplicates:
+                print(f"🔗 Collapsed {duplicates} duplicate URL(s): {len(unique_urls)} distinct videos")
+            return unique_urls, fan_out
+
+        def claim_cached(self, video_urls: list[str]) -> tuple[list[dict], dict, dict]:
+            """
+            Split URLs into pipeline jobs, cache hits and joins of in-flight analyses.
+
+            Returns:
+                tuple: (jobs to run, {index: cached result}, {index: future of another caller})
+            """
+            jobs, cached, waiting = [], {}, {}
+
+            for i, url in enumerate(video_urls):
+                if not SUMMARY_CACHE_ENABLED:
+                    jobs.append({'index': i, 'url': url, 'timings': {}})
+                    continue
+
+                cache_key = f"{video_cache_key(url)}|{self.cache_variant}"
+                state, value = summary_cache.claim(cache_key)
+                if state == 'hit':
+                    print(f"💾 Cache hit for video {i + 1}: {cache_key}")
+                    cached[i] = {'url': url, 'analysis': value}
+                elif state == 'wait':
+                    print(f"🔗 Video {i + 1} is already being analyzed, joining: {cache_key}")
+                    waiting[i] = value
+                else:
+                    jobs.append({'index': i, 'url': url, 'cache_key': cache_key, 'timings': {}})
+
+            return jobs, cached, waiting
+
+        def print_latency_report(self, jobs: list[dict]):
+            """Print per-video stage latencies, grouped by inline vs File API delivery"""
+            if not jobs:
+                return
+
+            print("\n⏱️ Per-video latency:")
+            totals = {}
+            for job in jobs:
+                timings = job['timings']
+                total = sum(timings.values())
+                delivery = job.get('delivery', 'failed')
+                totals.setdefault(delivery, []).append(total)
+                print(f"   [{job['index'] + 1}] {delivery:<8} "
+                      f"download {timings.get('download', 0):.1f}s | "
+                      f"upload {timings.get('upload', 0):.1f}s | "
+                      f"analysis {timings.get('analysis', 0):.1f}s | total {total:.1f}s")
+
+            for delivery, values in totals.items():
+                print(f"   {delivery}: {len(values)} videos, avg {sum(values) / len(values):.1f}s")
 
         def process(self, video_urls: list[str]) -> list[dict]:
             """Main processing function"""
@@ -699,42 +1582,121 @@ def summ_down(video_urls: list[str]) -> list[dict]:
                 print("⚠️ No video URLs provided")
                 return []
 
+            # Analyze each distinct video once and give every original URL its result
+            original_urls = video_urls
+            video_urls, fan_out = self.collapse_duplicates(video_urls)
+
+            if GEMINI_FILE_REGISTRY_ENABLED:
+                gemini_files.start_janitor()
+
+            # Drop partial downloads that are too old or over the staging budget
+            removed = cleanup_partials()
+            if removed:
+                print(f"🧹 Removed {removed} stale partial download(s)")
+
             videos = []
-            downloaded_files = []
+            claimed = []
 
             try:
-                # Phase 1: Download all videos
-                print("\n📥 PHASE 1: Downloading videos...")
-                for i, url in enumerate(video_urls, 1):
-                    print(f"\n--- Video {i}/{len(video_urls)} ---")
-                    video_path = self.download_single_video(url)
-                    if video_path:
-                        downloaded_files.append((url, video_path))
-                        print(f"✅ Video {i} download successful")
+                jobs, cached, waiting = self.claim_cached(video_urls)
+                claimed = jobs
+                print(f"\n💾 Summary cache: {len(cached)} hits, {len(waiting)} joined, {len(jobs)} to analyze")
+
+                triaged = {}
+                if self.triage_top_k and len(jobs) > self.triage_top_k:
+                    jobs, triaged = self.triage(jobs)
+
+                # Download, upload/processing and analysis run as overlapping
+                # stages so video N+1 downloads while video N is in Gemini
+                print(f"\n🚚 Pipeline workers - download: {DOWNLOAD_WORKERS}, "
+                      f"upload: {UPLOAD_WORKERS}, analysis: {ANALYSIS_WORKERS}")
+                stages = [
+                    ('download', self.download_stage, DOWNLOAD_WORKERS),
+                    ('upload', self.upload_stage, UPLOAD_WORKERS),
+                ]
+                if self.batch_size > 1:
+                    # Batches are formed once every video has been prepared
+                    results = self.run_batches(jobs, run_pipeline(jobs, stages))
+                elif self.deadline_seconds or self.min_success:
+                    stages.append(('analysis', self.analysis_stage, ANALYSIS_WORKERS))
+                    # Cache hits already count towards the quorum
+                    ready = sum(1 for result in cached.values() if not self.is_error_analysis(result['analysis']))
+                    needed = self.min_success - ready
+                    if self.min_success and needed <= 0:
+                        self.cancelled.set()
+                        results = [PipelineTimeout("Timed out: quorum met from cache") for _ in jobs]
                     else:
-                        print(f"❌ Video {i} download failed")
-                        videos.append({
-                            'url': url,
-                            'analysis': self.create_error_analysis('Download failed')
-                        })
-
-                print(f"\n📊 Download phase complete: {len(downloaded_files)} successful, {len(videos)} failed")
-
-                # Phase 2: Generate analyses
-                print(f"\n🤖 PHASE 2: Generating AI analyses...")
-                for i, (url, video_path) in enumerate(downloaded_files, 1):
-                    print(f"\n--- Analyzing {i}/{len(downloaded_files)} ---")
-                    analysis_data = self.analyze_video(video_path, url)
-                    videos.append(analysis_data)
-                    print(f"✅ Video {i} analysis complete")
+                        print(f"⏰ Quorum mode - need {max(needed, 0) or 'all'} more, "
+                              f"deadline {self.remaining_seconds() or 0:.0f}s")
+                        results = run_pipeline(
+                            jobs, stages,
+                            deadline_seconds=self.remaining_seconds(),
+                            min_success=max(needed, 0),
+                            is_success=lambda result: not self.is_error_analysis(result['analysis']),
+                            on_discard=self.discard_straggler,
+                            cancel_event=self.cancelled,
+                        )
+                else:
+                    stages.append(('analysis', self.analysis_stage, ANALYSIS_WORKERS))
+                    results = run_pipeline(jobs, stages)
+
+                by_index = {**cached, **triaged}
+                for job, result in zip(jobs, results):
+                    if isinstance(result, PipelineTimeout):
+                        print(f"⏰ {job['url']} {str(result).lower()}")
+                        if job.get('cache_key'):
+                            summary_cache.fail(job['cache_key'], result)
+                        result = {
+                            'url': job['url'],
+                            'analysis': self.create_error_analysis(str(result)),
+                            'timed_out': True
+                        }
+                    elif isinstance(result, Exception):
+                        print(f"❌ {job['url']} failed: {str(result)}")
+                        if job.get('cache_key'):
+                            summary_cache.fail(job['cache_key'], result)
+                        result = {
+                            'url': job['url'],
+                            'analysis': self.create_error_analysis(str(result))
+                        }
+                    if 'triage_score' in job:
+                        result['triage_score'] = job['triage_score']
+                    by_index[job['index']] = result
+
+                for i, future in waiting.items():
+                    try:
+                        analysis = future.result(timeout=0 if self.cancelled.is_set() else self.remaining_seconds())
+                    except FutureTimeoutError:
+                        by_index[i] = {
+                            'url': video_urls[i],
+                            'analysis': self.create_error_analysis("Timed out waiting for another session"),
+                            'timed_out': True
+                        }
+                        continue
+                    except Exception as e:
+                        analysis = self.create_error_analysis(str(e))
+                    by_index[i] = {'url': video_urls[i], 'analysis': analysis}
+
+                videos = [by_index[i] for i in range(len(video_urls))]
+                self.print_latency_report(jobs)
 
                 print(f"\n📊 Analysis phase complete!")
 
             except Exception as e:
                 print(f"❌ Processing failed with error: {str(e)}")
             finally:
-                # Phase 3: Cleanup
-                print(f"\n🧹 PHASE 3: Cleanup...")
+                # Parts that never reached analysis still hold budget or Gemini files
+                for job in claimed:
+                    if 'video_part' in job:
+                        self.release_video_part(job.pop('video_part'))
+
+                # Never leave other sessions waiting on a key we claimed
+                for job in claimed:
+                    if job.get('cache_key'):
+                        summary_cache.fail(job['cache_key'], RuntimeError('Analysis did not complete'))
+
+                # Cleanup
+                print(f"\n🧹 Cleanup...")
                 self.cleanup_all_files()
 
             successful = len([v for v in videos if 'Error' not in str(v.get('analysis', {}).get('hook_pattern', ''))])
@@ -744,10 +1706,76 @@ def summ_down(video_urls: list[str]) -> list[dict]:
             print(f"\n🎉 Processing complete! Results: {successful} successful, {failed} failed")
             print(f"⏱️ Total processing time: {processing_time}")
 
-            return videos
+            if self.batch_size > 1:
+                print(f"📦 Batch mode: {self.batch_requests} multi-video requests sent")
+
+            timed_out = sum(1 for v in videos if v.get('timed_out'))
+            if timed_out:
+                print(f"⏰ {timed_out} video(s) timed out and were skipped")
+
+            if self.triage_top_k:
+                print(f"🔎 Triage: {self.triage_avoided} full video analyses avoided "
+                      f"(top {self.triage_top_k} of {len(video_urls)} analyzed in full)")
+
+            if self.format_savings:
+                chosen_total = sum(chosen for chosen, _ in self.format_savings)
+                best_total = sum(best for _, best in self.format_savings)
+                print(f"🎚️ Format policy: downloaded {chosen_total / 1024 / 1024:.2f} MB instead of "
+                      f"{best_total / 1024 / 1024:.2f} MB at best quality "
+                      f"(saved {(best_total - chosen_total) / 1024 / 1024:.2f} MB)")
+
+            if SUMMARY_CACHE_ENABLED:
+                stats = summary_cache.stats()
+                print(f"💾 Summary cache - hit rate: {stats['hit_rate']:.0%} "
+                      f"({stats['hits']} hits, {stats['joined']} joined, {stats['misses']} misses), "
+                      f"saved {stats['bytes_saved'] / 1024 / 1024:.2f} MB of downloads")
+
+            for host, stats in host_throughput().items():
+                print(f"🌐 {host}: {stats['downloads']} download(s), "
+                      f"{stats['bytes'] / 1024 / 1024:.2f} MB at {stats['mb_per_s']:.2f} MB/s")
+
+            if ACTOR_MEDIA_ENABLED:
+                stats = actor_media.stats()
+                if stats['hits']:
+                    print(f"📦 Scraper-stored videos: {stats['hits'] - stats['failed']} used instead of yt-dlp "
+                          f"({sum(self.actor_media_bytes) / 1024 / 1024:.2f} MB), {stats['failed']} unavailable")
+
+            if MEDIA_CACHE_ENABLED:
+                stats = media_cache.stats()
+                print(f"💽 Media cache - hit rate: {stats['hit_rate']:.0%} "
+                      f"({stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evicted), "
+                      f"served {stats['bytes_served'] / 1024 / 1024:.2f} MB without downloading")
+
+            stats = media_budget.stats()
+            if stats['admitted'] or stats['spilled']:
+                print(f"🧮 Media memory: peak {stats['peak_bytes'] / 1024 / 1024:.2f} MB of "
+                      f"{stats['max_bytes'] / 1024 / 1024:.0f} MB budget, {stats['admitted']} admitted, "
+                      f"{stats['waited']} waited ({stats['wait_seconds']:.1f}s), {stats['spilled']} spilled to disk")
+
+            if GEMINI_FILE_REGISTRY_ENABLED:
+                stats = gemini_files.stats()
+                print(f"☁️ Gemini files: {stats['uploads']} uploaded, {stats['reused']} reused "
+                      f"({stats['bytes_saved'] / 1024 / 1024:.2f} MB not re-uploaded), "
+                      f"{stats['purged']} orphans purged, {stats['evicted']} evicted over the size cap")
+
+            if not videos:
+                return []
+            return [{**videos[fan_out[i]], 'url': url} for i, url in enumerate(original_urls)]
 
     # Execute the processing
-    processor = VideoProcessor()
+    windows = parse_clip_windows(clip_windows)
+    if not windows and clip_seconds and clip_seconds > 0:
+        windows = [(0.0, float(clip_seconds))]
+
+    processor = VideoProcessor(
+        windows=windows,
+        analysis_mode=analysis_mode,
+        triage_top_k=triage_top_k,
+        batch_size=batch_size,
+        deadline_seconds=deadline_seconds,
+        min_success=min_success,
+        segment_seconds=segment_seconds,
+    )
     return processor.process(video_urls)
 
 
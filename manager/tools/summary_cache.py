@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from dotenv import load_dotenv
+from manager.tools.sqlite_store import SQLiteStore, evict_lru
+
+load_dotenv()
+
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+SUMMARY_CACHE_PATH = os.getenv(
+    "SUMMARY_CACHE_PATH",
+    str(Path.home() / ".cache" / "automation_agent" / "summary_cache.sqlite3"),
+)
+SUMMARY_CACHE_TTL_HOURS = float(os.getenv("SUMMARY_CACHE_TTL_HOURS", "72"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+
+
+class SummaryCache(SQLiteStore):
+    """
+    Persistent video analysis cache keyed by platform video ID.
+
+    Entries expire after a TTL and the table is kept to a maximum number of
+    entries by evicting the least recently used ones. Concurrent requests for a
+    key that is already being analyzed join that in-flight call instead of
+    starting their own (singleflight).
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS summaries (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            source_bytes INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries (last_access)",
+    )
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        super().__init__(path, {'hits': 0, 'misses': 0, 'joined': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0})
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._in_flight = {}
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached value for a key, or None if missing or expired"""
+        now = time.time()
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT value, source_bytes, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, source_bytes, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                conn.commit()
+                return None
+
+            conn.execute("UPDATE summaries SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+
+        self.count(bytes_saved=source_bytes)
+        return json.loads(value)
+
+    def put(self, key: str, value: dict, source_bytes: int = 0):
+        """Store a value and evict least recently used entries over the size bound"""
+        now = time.time()
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, value, source_bytes, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value), source_bytes, now, now),
+            )
+            conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.ttl_seconds,))
+            evicted = evict_lru(conn, "summaries", self.max_entries)
+            conn.commit()
+
+        self.count(stores=1, evictions=evicted)
+
+    def claim(self, key: str) -> tuple[str, object]:
+        """
+        Look up a key and register interest in it.
+
+        Returns:
+            tuple[str, object]:
+                - ('hit', value) when a fresh cached value exists
+                - ('wait', future) when another caller is already computing it
+                - ('lead', None) when the caller must compute it and then call
+                  complete() or fail()
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                self._stats['joined'] += 1
+                return 'wait', in_flight
+
+            # Reserve the key before the lookup so a concurrent claim joins us
+            future = Future()
+            self._in_flight[key] = future
+
+        try:
+            value = self.get(key)
+        except Exception:
+            value = None
+
+        if value is not None:
+            with self._lock:
+                self._stats['hits'] += 1
+                del self._in_flight[key]
+            future.set_result(value)
+            return 'hit', value
+
+        self.count(misses=1)
+        return 'lead', None
+
+    def complete(self, key: str, value: dict, source_bytes: int = 0, store: bool = True):
+        """Publish the leader's result to waiters and optionally persist it"""
+        if store:
+            try:
+                self.put(key, value, source_bytes)
+            except Exception as e:
+                print(f"⚠️ Summary cache write failed: {str(e)}")
+        self._resolve(key, value=value)
+
+    def fail(self, key: str, error: Exception):
+        """Release waiters when the leader's computation failed"""
+        self._resolve(key, error=error)
+
+    def _resolve(self, key: str, value: dict = None, error: Exception = None):
+        with self._lock:
+            future = self._in_flight.pop(key, None)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def stats(self) -> dict:
+        """Hit/miss counters since process start"""
+        stats = super().stats()
+        lookups = stats['hits'] + stats['misses'] + stats['joined']
+        stats['hit_rate'] = (stats['hits'] + stats['joined']) / lookups if lookups else 0.0
+        return stats
+
+
+summary_cache = SummaryCache(
+    path=SUMMARY_CACHE_PATH,
+    ttl_seconds=SUMMARY_CACHE_TTL_HOURS * 3600,
+    max_entries=SUMMARY_CACHE_MAX_ENTRIES,
+)
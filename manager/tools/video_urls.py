@@ -0,0 +1,141 @@
+import re
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs
+import requests
+
+# Precompiled so they are not rebuilt for every URL. Matched against "<host><path>"
+# from the start, and an ID must not run on into more ID characters
+YOUTUBE_HOST = re.compile(r'(?:www\.|m\.)?youtube\.com')
+YOUTUBE_ID_PATTERNS = [
+    re.compile(r'(?:www\.|m\.)?youtube\.com/(?:shorts|embed|live|v)/([\w-]{11})(?![\w-])'),
+    re.compile(r'youtu\.be/([\w-]{11})(?![\w-])'),
+]
+YOUTUBE_VIDEO_ID = re.compile(r'[\w-]{11}')
+TIKTOK_ID_PATTERNS = [
+    re.compile(r'(?:www\.|m\.)?tiktok\.com/@[\w.-]+/video/(\d+)(?![\w-])'),
+    re.compile(r'(?:www\.|m\.)?tiktok\.com/(?:v|embed(?:/v2)?)/(\d+)(?![\w-])'),
+]
+# Short links that only carry a redirect token, not the video ID
+TIKTOK_SHORT_LINK_PATTERNS = [
+    re.compile(r'^https?://(?:vm|vt)\.tiktok\.com/[\w.-]+'),
+    re.compile(r'^https?://(?:www\.|m\.)?tiktok\.com/t/[\w.-]+'),
+]
+SHORT_LINK_TIMEOUT = 10
+SHORT_LINK_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                                    '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'}
+
+
+def parse_video_url(url: str) -> tuple[str, str] | None:
+    """
+    Extract the platform and platform video ID from a video URL.
+
+    Args:
+        url (str): TikTok or YouTube video URL.
+
+    Returns:
+        tuple[str, str] | None: (platform, video_id), e.g. ('youtube', 'rqLEUxeOQWo'),
+            or None when the URL does not carry a recognisable video ID.
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = f"https://{url}"
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    if YOUTUBE_HOST.fullmatch(host) and parsed.path == '/watch':
+        video_id = parse_qs(parsed.query).get('v', [''])[0]
+        if YOUTUBE_VIDEO_ID.fullmatch(video_id):
+            return 'youtube', video_id
+
+    # Only the host and path: an ID inside a query string or on another host does not count
+    location = host + parsed.path
+    for pattern in YOUTUBE_ID_PATTERNS:
+        match = pattern.match(location)
+        if match:
+            return 'youtube', match.group(1)
+
+    for pattern in TIKTOK_ID_PATTERNS:
+        match = pattern.match(location)
+        if match:
+            return 'tiktok', match.group(1)
+
+    return None
+
+
+def video_cache_key(url: str) -> str:
+    """
+    Build a stable cache key for a video URL.
+
+    Different URL forms of the same video map to the same "platform:video_id" key.
+    URLs without a recognisable ID fall back to the URL without query or fragment.
+    """
+    parsed_id = parse_video_url(url)
+    if parsed_id:
+        return f"{parsed_id[0]}:{parsed_id[1]}"
+
+    parsed = urlparse(url.strip())
+    return f"url:{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+
+
+def canonical_video_url(url: str) -> str:
+    """
+    Return the canonical watch URL for a video, or the URL unchanged if it has no known ID.
+
+    e.g. https://youtu.be/<id> and /shorts/<id> both become https://www.youtube.com/watch?v=<id>
+    """
+    parsed_id = parse_video_url(url)
+    if not parsed_id:
+        return url
+
+    platform, video_id = parsed_id
+    if platform == 'youtube':
+        return f"https://www.youtube.com/watch?v={video_id}"
+    return url
+
+
+def is_short_link(url: str) -> bool:
+    return any(pattern.match(url.strip()) for pattern in TIKTOK_SHORT_LINK_PATTERNS)
+
+
+@lru_cache(maxsize=1024)
+def _follow_redirects(url: str) -> str:
+    """Final URL behind a short link; raises on failure so that only successes are cached"""
+    response = requests.head(url, headers=SHORT_LINK_HEADERS, allow_redirects=True, timeout=SHORT_LINK_TIMEOUT)
+    if response.status_code < 400:
+        return response.url
+
+    # Some edges reject HEAD; a streamed GET follows the same redirects without the body
+    with requests.get(url, headers=SHORT_LINK_HEADERS, allow_redirects=True,
+                      timeout=SHORT_LINK_TIMEOUT, stream=True) as get_response:
+        get_response.raise_for_status()
+        return get_response.url
+
+
+def resolve_short_link(url: str) -> str:
+    """
+    Follow a short link's redirects to the full video URL.
+
+    Successful lookups are cached for the life of the process. Returns the URL
+    unchanged if the lookup fails, and tries again on the next call.
+    """
+    try:
+        return _follow_redirects(url)
+    except requests.RequestException as e:
+        print(f"⚠️ Could not resolve short link {url}: {str(e)}")
+        return url
+
+
+def resolve_video_url(url: str) -> str:
+    """Return the URL with surrounding whitespace removed and short links expanded"""
+    url = url.strip()
+    return resolve_short_link(url) if is_short_link(url) else url
+
+
+def video_platform(url: str) -> str:
+    """'tiktok', 'youtube' or 'unknown'"""
+    parsed_id = parse_video_url(url)
+    if parsed_id:
+        return parsed_id[0]
+    if is_short_link(url):
+        return 'tiktok'
+    return 'unknown'
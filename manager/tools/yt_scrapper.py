@@ -1,27 +1,14 @@
-from apify_client import ApifyClient
-import os
-from dotenv import load_dotenv
+from manager.tools.apify_async import run_actor, run_sync
 
-load_dotenv()
+ACTOR_ID = "h7sDV53CddomktSi5"
+# Only these item fields are downloaded from the dataset
+RESULT_FIELDS = ["title", "url", "viewCount"]
+# Top Shorts for a query barely move within this window
+CACHE_TTL_SECONDS = 15 * 60
 
-API_TOKEN = os.getenv("APIFY_API_TOKEN")
-client = ApifyClient(API_TOKEN)
 
-def yt_scrapper(s_term: str, sorting: str, short_c: int = 2)-> list[dict]:
-    """
-    Scrapes YouTube videos using Apify Actor.
-
-    Args:
-        s_term (str): Search term to find videos.
-        short_c (int): Number of shorts to fetch.
-        sorting (str): Sort videos by criteria (e.g., "POPULAR", "RELEVANCE").
-
-    Returns:
-        list: A list of scraped video data.
-    """
-
-
-    run_input = {
+def build_run_input(s_term: str, sorting: str, short_c: int) -> dict:
+    return {
         "downloadSubtitles": False,
         "hasCC": False,
         "hasLocation": False,
@@ -43,10 +30,26 @@ def yt_scrapper(s_term: str, sorting: str, short_c: int = 2)-> list[dict]:
         "sortVideosBy": sorting
     }
 
-    run = client.actor("h7sDV53CddomktSi5").call(run_input=run_input)
+
+async def yt_scrapper_async(s_term: str, sorting: str, short_c: int = 2) -> list[dict]:
+    """
+    Scrapes YouTube videos using Apify Actor without blocking the event loop.
+
+    Args:
+        s_term (str): Search term to find videos.
+        short_c (int): Number of shorts to fetch.
+        sorting (str): Sort videos by criteria (e.g., "POPULAR", "RELEVANCE").
+
+    Returns:
+        list: A list of scraped video data.
+    """
+    items = await run_actor(
+        ACTOR_ID, build_run_input(s_term, sorting, short_c), fields=RESULT_FIELDS, limit=short_c,
+        cache_ttl_seconds=CACHE_TTL_SECONDS,
+    )
 
     results = []
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
+    for item in items:
         results.append({
             "title": item.get("title"),
             "url": item.get("url"),
@@ -56,6 +59,21 @@ def yt_scrapper(s_term: str, sorting: str, short_c: int = 2)-> list[dict]:
     return results
 
 
+def yt_scrapper(s_term: str, sorting: str, short_c: int = 2)-> list[dict]:
+    """
+    Scrapes YouTube videos using Apify Actor.
+
+    Args:
+        s_term (str): Search term to find videos.
+        short_c (int): Number of shorts to fetch.
+        sorting (str): Sort videos by criteria (e.g., "POPULAR", "RELEVANCE").
+
+    Returns:
+        list: A list of scraped video data.
+    """
+    return run_sync(yt_scrapper_async(s_term, sorting, short_c))
+
+
 
 # # Example usage/
 # if __name__ == "__main__":